@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+from email import policy
+from email.parser import BytesParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# End-to-end check of the "http" and "browser" upload backends against a local
+# mock server - no real upload site, account or API key involved.
+#
+#   python backend_check.py                   # both backends (browser is skipped without playwright/chromium)
+#   python backend_check.py --backends http
+#
+# The mock accepts multipart POSTs like the GIPHY upload endpoint, answers the
+# first attempt of every file with 503 (so the retry path runs) and rejects the
+# key "bad-key" with 401 (which must not be retried). The browser backend is
+# pointed at fixtures/upload_form.html, which matches the default BROWSER_SELECTORS.
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "upload_form.html")
+CHECK_GIFS = 5  # output_N.gif files uploaded per check
+TINY_GIF = (b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00"
+            b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;")  # 1x1 GIF
+
+class SkipCheck(Exception):
+    """A check cannot run here (its reason is the message)"""
+
+class MockUploadServer(ThreadingHTTPServer):
+    """Records every multipart upload it receives"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MockUploadHandler)
+        self.lock = threading.Lock()
+        self.attempts = {}   # filename -> POSTs seen
+        self.accepted = []   # {"filename", "bytes", "fields"} per accepted file
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class MockUploadHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/upload_form.html":
+            self.send_error(404)
+            return
+        with open(FIXTURE_PATH, "rb") as f:
+            page = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            self.reply(400, {"error": "not multipart"})
+            return
+        message = BytesParser(policy=policy.default).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body)
+
+        fields, files = {}, []
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename():
+                files.append((part.get_filename(), part.get_payload(decode=True)))
+            else:
+                fields.setdefault(name, []).append(part.get_content().strip())
+
+        if self.path == "/upload" and fields.get("api_key") == ["bad-key"]:
+            self.reply(401, {"error": "invalid api key"})
+            return
+
+        server = self.server
+        with server.lock:
+            first_try = []
+            for filename, _ in files:
+                server.attempts[filename] = server.attempts.get(filename, 0) + 1
+                first_try.append(server.attempts[filename] == 1)
+            # The HTTP backend must retry transient errors
+            if self.path == "/upload" and all(first_try):
+                self.reply(503, {"error": "try again"})
+                return
+            for index, (filename, data) in enumerate(files):
+                per_file = {name: values[index] if len(values) == len(files) else values[0]
+                            for name, values in fields.items()}
+                server.accepted.append({"filename": filename, "bytes": data, "fields": per_file})
+        self.reply(200, {"ok": True, "files": len(files)})
+
+    def reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def make_gifs(folder):
+    """CHECK_GIFS tiny output_N.gif files"""
+    os.makedirs(folder, exist_ok=True)
+    for number in range(1, CHECK_GIFS + 1):
+        with open(os.path.join(folder, f"output_{number}.gif"), "wb") as f:
+            f.write(TINY_GIF)
+
+def expect(problems, condition, message):
+    if not condition:
+        problems.append(message)
+
+def check_http(core, server, work_dir):
+    """Upload through the "http" backend; returns a list of problems"""
+    problems = []
+    folder = os.path.join(work_dir, "http.gifs")
+    make_gifs(folder)
+    tags = ["#Movie", "#Hero", "#Dance"]
+
+    core.HTTP_UPLOAD_URL = f"{server.url}/upload"
+    core.HTTP_UPLOAD_API_KEY = "test-key"
+    uploaded = core.upload_with_http(folder, CHECK_GIFS, tags)
+
+    expect(problems, uploaded == CHECK_GIFS, f"http: {uploaded}/{CHECK_GIFS} uploaded")
+    names = sorted(item["filename"] for item in server.accepted)
+    expect(problems, names == sorted(f"output_{n}.gif" for n in range(1, CHECK_GIFS + 1)),
+           f"http: server accepted {names}")
+    for item in server.accepted:
+        expect(problems, item["bytes"] == TINY_GIF, f"http: {item['filename']} arrived corrupted")
+        expect(problems, item["fields"].get("api_key") == "test-key", f"http: {item['filename']} without api_key")
+        expect(problems, item["fields"].get("tags") == "Movie,Hero,Dance",
+               f"http: {item['filename']} tags {item['fields'].get('tags')!r}")
+    expect(problems, all(count == 2 for count in server.attempts.values()),
+           f"http: expected one retry per file after 503, saw {server.attempts}")
+
+    # A client error must fail fast instead of being retried
+    server.attempts.clear()
+    core.HTTP_UPLOAD_API_KEY = "bad-key"
+    ok, message = core.upload_gif_http(os.path.join(folder, "output_1.gif"), tags)
+    expect(problems, not ok and message == "HTTP 401", f"http: bad key gave {ok}, {message!r}")
+    expect(problems, server.attempts.get("output_1.gif", 0) == 0, "http: 401 was retried")
+    return problems
+
+def require_chromium():
+    """Raise SkipCheck unless playwright and its headless chromium are installed"""
+    try:
+        from playwright.sync_api import sync_playwright, Error as PlaywrightError
+    except ImportError:
+        raise SkipCheck("playwright is not installed")
+    with sync_playwright() as playwright:
+        try:
+            playwright.chromium.launch(headless=True).close()
+        except PlaywrightError:
+            raise SkipCheck("playwright has no chromium - run: playwright install chromium")
+
+def check_browser(core, server, work_dir):
+    """Upload through the "browser" backend; returns a list of problems"""
+    require_chromium()
+    problems = []
+    folder = os.path.join(work_dir, "browser.gifs")
+    make_gifs(folder)
+    tags = ["#Movie", "#Hero"]
+
+    core.BROWSER_UPLOAD_URL = f"{server.url}/upload_form.html"
+    core.BROWSER_PROFILE_DIR = os.path.join(work_dir, "profiles")
+    core.BROWSER_HEADLESS = True
+    core.BROWSER_SESSIONS = 2
+    core.BROWSER_BATCH_SIZE = 2
+    core.BROWSER_TIMEOUT_MS = 15000
+    uploaded = core.upload_with_browser(folder, CHECK_GIFS, tags)
+
+    expect(problems, uploaded == CHECK_GIFS, f"browser: {uploaded}/{CHECK_GIFS} uploaded")
+    names = sorted(item["filename"] for item in server.accepted)
+    expect(problems, names == sorted(f"output_{n}.gif" for n in range(1, CHECK_GIFS + 1)),
+           f"browser: server accepted {names}")
+    for item in server.accepted:
+        expect(problems, item["bytes"] == TINY_GIF, f"browser: {item['filename']} arrived corrupted")
+        expect(problems, item["fields"].get("tags") == "#Movie #Hero",
+               f"browser: {item['filename']} tags {item['fields'].get('tags')!r}")
+    return problems
+
+CHECKS = {
+    "http": check_http,
+    "browser": check_browser,
+}
+
+def run_checks(backends):
+    """Run the checks; returns the exit code"""
+    from tenorgifuploader import core
+
+    core.TIMING_ENABLED = False
+    failed = False
+    work_dir = tempfile.mkdtemp(prefix="backend_check_")
+    try:
+        for name in backends:
+            server = MockUploadServer()
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                print(f"\n🔌 Checking the {name} backend against {server.url}...")
+                problems = CHECKS[name](core, server, work_dir)
+            except SkipCheck as e:
+                print(f"⏭  {name}: skipped ({e})")
+                continue
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            if problems:
+                failed = True
+                print(f"❌ {name}: {len(problems)} problem(s)")
+                for problem in problems:
+                    print(f"   {problem}")
+            else:
+                print(f"✅ {name}: every GIF arrived once, intact, with its tags")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the http/browser upload backends against a local mock server")
+    parser.add_argument("--backends", nargs="+", choices=list(CHECKS), default=list(CHECKS))
+    args = parser.parse_args()
+    sys.exit(run_checks(args.backends))
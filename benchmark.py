@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+
+# Reproducible benchmark of the GIF conversion path (tenorgifuploader.core.video_to_gifs).
+# Synthetic videos are generated with ffmpeg test sources, every case/mode is
+# measured in a fresh worker process, and results are compared to a baseline.
+#
+#   python benchmark.py                  # run and compare with the baseline
+#   python benchmark.py --save-baseline  # run and store the results as the new baseline
+#   python benchmark.py --cases short_360p --modes palette --repeats 1
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench")  # Sources, outputs and results
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")  # Results of the last --save-baseline run
+BENCH_REPEATS = 3  # Runs per case/mode; the median is reported
+REGRESSION_TOLERANCE = 0.15  # Slower / bigger than the baseline by more than this counts as a regression
+
+# Synthetic sources: name -> (seconds, width, height). testsrc2 is deterministic,
+# so every machine encodes exactly the same input.
+BENCH_CASES = {
+    "short_360p": (12, 640, 360),
+    "medium_720p": (30, 1280, 720),
+    "long_1080p": (60, 1920, 1080),
+}
+
+# Conversion engine settings per mode (see core.video_to_gifs)
+BENCH_MODES = {
+    "serial": {"mode": "per_clip", "profile": "plain"},
+    "parallel": {"mode": "parallel", "profile": "plain"},
+    "single_pass": {"mode": "single_pass", "profile": "plain"},
+    "palette": {"mode": "single_pass", "profile": "palette"},
+}
+
+# Compared against the baseline (lower is better for all of them)
+BENCH_METRICS = ["wall_seconds", "cpu_seconds", "peak_rss_mb", "bytes_per_gif"]
+
+def ffmpeg_version():
+    """First line of `ffmpeg -version` (results are only comparable with the same build)"""
+    try:
+        result = subprocess.run(["ffmpeg", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        return result.stdout.splitlines()[0] if result.stdout else "unknown"
+    except OSError:
+        return "ffmpeg not found"
+
+def machine_info():
+    """What the numbers depend on besides the code"""
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg_version(),
+    }
+
+def generate_source(name):
+    """
+    Create (once) the synthetic source video for a case: testsrc2 pattern,
+    30 fps H.264, no audio. Returns its path.
+    """
+    seconds, width, height = BENCH_CASES[name]
+    path = os.path.join(BENCH_DIR, "sources", f"{name}.mp4")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    print(f"🎬 Generating {name}: {seconds}s {width}x{height}...")
+    command = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30:duration={seconds}",
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-g", "60",
+        path,
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not generate {name}: {result.stderr[:200]}")
+    return path
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process and of its largest ffmpeg child, in MB.
+    None where the resource module is missing (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / scale, 1)
+
+def run_worker(case, mode_name):
+    """
+    One measurement, in this (fresh) process: convert the case's source with
+    the mode's settings and print the metrics as JSON.
+    Caches and optional steps are switched off and the probe/hash cache is
+    warmed first, so only the conversion is timed.
+    """
+    from tenorgifuploader import core
+
+    work_dir = os.path.join(BENCH_DIR, "work", f"{case}_{mode_name}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+
+    core.CLIP_PLANNING = "fixed"
+    core.DEDUP_ENABLED = False
+    core.CONVERSION_CACHE_ENABLED = False
+    core.TIMING_ENABLED = False
+    core.ENCODER = "plain"
+    core.PROBE_CACHE_PATH = os.path.join(work_dir, "probe_cache.json")
+
+    source = generate_source(case)
+    output_dir = os.path.join(work_dir, "gifs")
+    settings = BENCH_MODES[mode_name]
+
+    # ffprobe and the source hash are cached per file - warm both outside the timed region
+    core.probe_video(source)
+    core.source_fingerprint(source)
+
+    wall_start = time.perf_counter()
+    cpu_start = os.times()
+    gifs = core.video_to_gifs(source, output_dir, mode=settings["mode"], profile=settings["profile"])
+    cpu_end = os.times()
+    wall = time.perf_counter() - wall_start
+
+    # ffmpeg does the work, so its (child) CPU time counts too; Windows reports 0 for children
+    cpu = sum(cpu_end[i] - cpu_start[i] for i in range(4))
+    gif_bytes = sum(os.path.getsize(os.path.join(output_dir, name))
+                    for name in os.listdir(output_dir) if name.endswith(".gif") and name.startswith("output_"))
+
+    print(json.dumps({
+        "gifs": gifs,
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "bytes_per_gif": round(gif_bytes / gifs) if gifs else None,
+    }))
+
+def measure(case, mode_name):
+    """Run one worker process and return its metrics"""
+    # The core prints emoji; keep the worker's piped output UTF-8 on Windows too
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", case, mode_name],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+                            text=True, encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(f"{case}/{mode_name} failed: {result.stderr[-300:]}")
+    # The core prints progress; the metrics are the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def median_metrics(runs):
+    """Median of every metric over the repeats"""
+    merged = {"gifs": runs[0]["gifs"], "runs": len(runs)}
+    for metric in BENCH_METRICS:
+        values = [run[metric] for run in runs if run[metric] is not None]
+        merged[metric] = round(statistics.median(values), 3) if values else None
+    return merged
+
+def compare(results, baseline):
+    """
+    Lines describing every metric that got worse than the baseline by more than
+    REGRESSION_TOLERANCE (empty if there are none).
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if previous.get("gifs") != current.get("gifs"):
+            regressions.append(f"{key}: {current.get('gifs')} GIFs (baseline {previous.get('gifs')})")
+        for metric in BENCH_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > REGRESSION_TOLERANCE:
+                regressions.append(f"{key}: {metric} {new} vs baseline {old} (+{change:.0%})")
+    return regressions
+
+def print_table(results, baseline):
+    print(f"\n{'case/mode':<26}{'gifs':>5}{'wall s':>9}{'cpu s':>9}{'rss MB':>9}{'KB/gif':>9}{'vs base':>9}")
+    for key, row in results.items():
+        previous = baseline.get(key, {})
+        delta = ""
+        if previous.get("wall_seconds"):
+            delta = f"{(row['wall_seconds'] - previous['wall_seconds']) / previous['wall_seconds']:+.0%}"
+        rss = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+        size = f"{row['bytes_per_gif'] / 1024:.0f}" if row["bytes_per_gif"] is not None else "-"
+        print(f"{key:<26}{row['gifs']:>5}{row['wall_seconds']:>9.2f}{row['cpu_seconds']:>9.2f}{rss:>9}{size:>9}{delta:>9}")
+
+def run_benchmarks(cases, modes, repeats, save_baseline):
+    """Measure every case x mode, compare with the baseline. Returns the exit code."""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    info = machine_info()
+    print(f"🖥 {info['platform']} | {info['cpu_count']} CPUs | {info['ffmpeg']}")
+
+    # Generate the sources up front so no measurement includes it
+    for case in cases:
+        generate_source(case)
+
+    results = {}
+    for case in cases:
+        for mode_name in modes:
+            key = f"{case}/{mode_name}"
+            runs = []
+            for repeat in range(repeats):
+                print(f"⏱ {key} (run {repeat + 1}/{repeats})...")
+                runs.append(measure(case, mode_name))
+            results[key] = median_metrics(runs)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        baseline = stored.get("results", {})
+        if stored.get("machine") != info:
+            print("⚠️  Baseline was recorded on a different machine / ffmpeg build - compare with care")
+
+    print_table(results, baseline)
+
+    record = {"machine": info, "time": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+    with open(os.path.join(BENCH_DIR, f"results_{time.strftime('%Y%m%d_%H%M%S')}.json"), "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=1)
+
+    if save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=1)
+        print(f"\n💾 Baseline saved: {BASELINE_PATH}")
+        return 0
+
+    if not baseline:
+        print("\n💡 No baseline yet - run with --save-baseline to store one")
+        return 0
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {REGRESSION_TOLERANCE:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print(f"\n✅ No regressions beyond {REGRESSION_TOLERANCE:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the GIF conversion path")
+    parser.add_argument("--cases", nargs="+", choices=list(BENCH_CASES), default=list(BENCH_CASES))
+    parser.add_argument("--modes", nargs="+", choices=list(BENCH_MODES), default=list(BENCH_MODES))
+    parser.add_argument("--repeats", type=int, default=BENCH_REPEATS)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--worker", nargs=2, metavar=("CASE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+    else:
+        sys.exit(run_benchmarks(args.cases, args.modes, args.repeats, args.save_baseline))
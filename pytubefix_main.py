@@ -0,0 +1,8 @@
+# pytubefix downloads, Gemini tags, Opera upload (renamed from pytubefix.py, which shadowed the pytubefix library).
+# Same as: python -m tenorgifuploader --preset pytubefix
+import sys
+
+from tenorgifuploader.cli import main
+
+if __name__ == "__main__":
+    main(["--preset", "pytubefix"] + sys.argv[1:])
@@ -0,0 +1,19 @@
+"""
+TenorGIFUploader: download videos, convert them to GIF clips and upload them
+to Tenor with AI-generated tags.
+
+The engine lives in tenorgifuploader.core (configuration constants at the top,
+pluggable DOWNLOADERS / TAGGERS / UPLOAD_BACKENDS registries); the command line
+entry point is tenorgifuploader.cli (python -m tenorgifuploader).
+"""
+
+from .core import (
+    DOWNLOADERS,
+    TAGGERS,
+    UPLOAD_BACKENDS,
+    extract_urls_from_input,
+    video_to_gifs,
+    VideoJob,
+    process_single_video,
+    run_urls,
+)
@@ -0,0 +1,144 @@
+import os
+import sys
+import argparse
+
+from . import core
+
+# Uploader strategies: core settings applied by --uploader
+UPLOADERS = {
+    "adaptive": {"UPLOAD_BACKEND": "pyautogui", "TAG_LAYOUT": "fields"},  # Batch planner grows/shrinks the batch (BATCH_SIZE_MIN..MAX)
+    "3-batch": {"UPLOAD_BACKEND": "pyautogui", "TAG_LAYOUT": "fields",
+                "BATCH_SIZE_INITIAL": 3, "BATCH_SIZE_MIN": 3, "BATCH_SIZE_MAX": 3},
+    "10-batch": {"UPLOAD_BACKEND": "pyautogui", "TAG_LAYOUT": "scroll",  # Scrolling 10-file tag form
+                 "BATCH_SIZE_INITIAL": 10, "BATCH_SIZE_MIN": 10, "BATCH_SIZE_MAX": 10},
+    "giphy": {"UPLOAD_BACKEND": "http"},  # POST to HTTP_UPLOAD_URL
+    "browser": {"UPLOAD_BACKEND": "browser"},  # Headless DOM automation
+}
+
+# What each of the old stand-alone scripts did, as core settings.
+# --preset applies these first; explicit options override them.
+PRESETS = {
+    "main": {},
+    "ytdlp": {"DOWNLOADER": "yt_dlp", "TAGGER": "gemini", "SKIP_EDGES_SECONDS": 5},
+    "pytubefix": {"DOWNLOADER": "pytubefix", "TAGGER": "gemini", "SKIP_EDGES_SECONDS": 5},
+    "chrome": {"DOWNLOADER": "pytubefix", "TAGGER": "gemini", "BROWSER": "chrome", "SKIP_EDGES_SECONDS": 5},
+    "chrome-optimized": {"DOWNLOADER": "pytubefix", "TAGGER": "gemini", "UPLOAD_BACKEND": "http",
+                         "SKIP_EDGES_SECONDS": 5},
+    "cerebras": {"DOWNLOADER": "pytubefix", "TAGGER": "cerebras", "BROWSER": "chrome", "SKIP_EDGES_SECONDS": 5},
+    "cerebras-logo": {"DOWNLOADER": "pytubefix", "TAGGER": "cerebras", "BROWSER": "chrome", "SKIP_EDGES_SECONDS": 5,
+                      "ENCODER": "logo", "UNIVERSAL_TAG": "#HariPrajwal"},
+    "10gifs": {"DOWNLOADER": "pytubefix", "TAGGER": "cerebras", "BROWSER": "chrome", "SKIP_EDGES_SECONDS": 5,
+               "ENCODER": "logo", "UNIVERSAL_TAG": "#HariPrajwal", **UPLOADERS["10-batch"]},
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="tenorgifuploader",
+                                     description="Download videos, convert them to GIFs and upload them to Tenor")
+    parser.add_argument("urls", nargs="*", help="Video URL(s) (video files with --convert-only); prompted for when omitted")
+    parser.add_argument("--preset", choices=list(PRESETS), help="Settings of one of the old stand-alone scripts")
+    parser.add_argument("--downloader", choices=list(core.DOWNLOADERS))
+    parser.add_argument("--tagger", choices=list(core.TAGGERS))
+    parser.add_argument("--encoder", choices=["plain", "logo"])
+    parser.add_argument("--uploader", choices=list(UPLOADERS))
+    parser.add_argument("--browser", choices=["opera", "chrome"], help="Browser the pyautogui uploader opens")
+    parser.add_argument("--universal-tag", help="Tag appended to every Cerebras tag list")
+    parser.add_argument("--skip-edges", type=float, metavar="SECONDS",
+                        help="Seconds of intro and outro not turned into GIFs")
+    parser.add_argument("--http-api-key", help="API key for the giphy uploader (default: GIPHY_API_KEY environment variable)")
+    parser.add_argument("--no-pipeline", action="store_true", help="Process the videos strictly one after another")
+    parser.add_argument("--convert-only", action="store_true", help="Only convert local video files to GIFs")
+    parser.add_argument("--dry-run", action="store_true", help="Show the settings and check the backends, then exit")
+    return parser
+
+def apply_settings(settings):
+    """Set core configuration constants by name"""
+    for name, value in settings.items():
+        setattr(core, name, value)
+
+def report_missing(stages):
+    """Print what the selected backends are missing. Returns True if nothing is."""
+    missing = core.missing_backends(stages)
+    if missing:
+        print("❌ Missing backends for this run:")
+        for line in missing:
+            print(f"   {line}")
+    return not missing
+
+def convert_files(paths):
+    """--convert-only: turn local video files into GIF folders. Returns the number converted."""
+    converted = 0
+    for path in paths:
+        if not os.path.isfile(path):
+            print(f"❌ Not a file: {path}")
+            continue
+        title = os.path.splitext(os.path.basename(path))[0]
+        if core.video_to_gifs(path, core.gif_output_dir_for(title, path)):
+            converted += 1
+    print(f"✅ Converted {converted}/{len(paths)} videos")
+    core.TIMER.report()
+    return converted
+
+def main(argv=None):
+    """Command line entry point. Returns the number of videos processed successfully."""
+    args = build_parser().parse_args(argv)
+
+    apply_settings(PRESETS.get(args.preset, {}))
+    if args.uploader:
+        apply_settings(UPLOADERS[args.uploader])
+    overrides = {
+        "DOWNLOADER": args.downloader,
+        "TAGGER": args.tagger,
+        "ENCODER": args.encoder,
+        "BROWSER": args.browser,
+        "UNIVERSAL_TAG": args.universal_tag,
+        "SKIP_EDGES_SECONDS": args.skip_edges,
+        "HTTP_UPLOAD_API_KEY": args.http_api_key,
+    }
+    apply_settings({name: value for name, value in overrides.items() if value is not None})
+    if args.no_pipeline:
+        core.PIPELINE_ENABLED = False
+
+    stages = ("convert",) if args.convert_only else ("download", "convert", "upload")
+    if args.dry_run:
+        print(f"🔧 downloader={core.DOWNLOADER} tagger={core.TAGGER} encoder={core.ENCODER} "
+              f"uploader={core.UPLOAD_BACKEND} browser={core.BROWSER} pipeline={core.PIPELINE_ENABLED}")
+        if report_missing(stages):
+            print("✅ All backends for this run are installed")
+            return 0
+        sys.exit(1)
+
+    # Report missing optional packages now, not halfway through the first video
+    if not report_missing(stages):
+        sys.exit(1)
+
+    if args.convert_only:
+        return convert_files(args.urls)
+
+    print("🎥 MULTI-VIDEO DOWNLOADER & GIF CONVERTER")
+    print("=" * 50)
+
+    # Get multiple video links from the command line or the user
+    video_links_input = " ".join(args.urls).strip()
+    if not video_links_input:
+        video_links_input = input("Paste video URL(s) (separated by spaces or commas) and press Enter: ").strip()
+
+    if not video_links_input:
+        print("No URL provided. Exiting.")
+        sys.exit()
+
+    # Extract multiple URLs from input - WITH CONTINUOUS LINK SUPPORT
+    urls = core.extract_urls_from_input(video_links_input)
+
+    if not urls:
+        print("❌ No valid URLs found. Please provide valid YouTube links.")
+        sys.exit()
+
+    print(f"📋 Found {len(urls)} video URL(s) to process:")
+    for i, url in enumerate(urls):
+        print(f"  {i+1}. {url}")
+
+    # Generate the Cerebras tags of later videos while the first ones download
+    if core.TAGGER == "cerebras" and len(urls) > 1:
+        core.prefetch_tags_in_background(urls)
+
+    return core.run_urls(urls)
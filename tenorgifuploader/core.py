@@ -0,0 +1,3582 @@
+import os
+import math
+import subprocess
+import time
+import webbrowser
+import platform
+import sys
+import re
+import json
+import hashlib
+import threading
+import queue
+import uuid
+import shutil
+import mimetypes
+import urllib.request
+import urllib.error
+import functools
+import importlib.util
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+# Configuration (per-video state lives in VideoJob)
+CLIP_LENGTH = 3  # Seconds per GIF
+GIF_FPS = 15  # Frame rate of every GIF
+CONVERSION_MODE = "single_pass"  # "single_pass" (decode once), "parallel" (worker pool) or "per_clip"
+SINGLE_PASS_GROUP_SIZE = 40  # Clips per single-pass ffmpeg run (keeps the filter graph small)
+CONVERSION_WORKERS = os.cpu_count() or 4  # Max concurrent ffmpeg processes in "parallel" mode
+ENCODING_PROFILE = "palette"  # "palette" (one optimized palette per video) or "plain" (ffmpeg default palette)
+PALETTE_SAMPLE_FPS = 2  # Frames per second sampled when building the per-video palette
+PALETTE_FILENAME = "palette.png"  # Stored next to the GIFs and reused for every clip
+DOWNLOAD_WORKERS = 4  # Max concurrent downloads in download_videos_batch
+DOWNLOAD_PROFILE = "gif"  # "gif" (smallest video-only stream >= GIF_TARGET_WIDTH) or "best" (bestvideo+bestaudio)
+GIF_TARGET_WIDTH = 480  # Width the GIFs are scaled to - no point downloading much more than this
+DOWNLOAD_SECTION = None  # (skip_start, skip_end) seconds to leave out of the download, e.g. (5, 5)
+PIPELINE_ENABLED = True  # Overlap download / convert / upload across the URL list
+PIPELINE_QUEUE_SIZE = 2  # Max finished items waiting between two pipeline stages
+CLIP_PLANNING = "scenes"  # "scenes" (cut on shot changes, drop black/static clips) or "fixed" (every clip_length s)
+SKIP_EDGES_SECONDS = 0  # Seconds of intro and outro never turned into GIFs (the old scripts skipped 5 each)
+SCENE_THRESHOLD = 0.3  # ffmpeg scene score (0-1) that counts as a shot change
+SCENE_MIN_CLIP_LENGTH = 1.5  # Shot leftovers shorter than this are not turned into GIFs
+SCENE_MAX_BLACK_RATIO = 0.5  # Drop clips that are more than this fraction black
+SCENE_MAX_STATIC_RATIO = 0.8  # Drop clips that are more than this fraction frozen/static
+DEDUP_ENABLED = True  # Skip GIFs that look almost the same as one already kept/uploaded (needs numpy)
+DEDUP_MAX_DISTANCE = 6  # Max differing bits (of 64) between any two aligned frame hashes of a duplicate
+DEDUP_SAMPLE_FPS = 2  # Frames per second sampled from each GIF for its hash
+HASH_INDEX_PATH = r"D:\downloads\gif_hash_index.json"  # Hashes of every GIF kept so far, across all videos
+CONVERSION_CACHE_ENABLED = True  # Reuse GIFs made from the same source bytes with the same encoding settings
+CONVERSION_CACHE_DIR = r"C:\Users\harip\ALL TEST\.gif_cache"  # One <sha256 of source + clip + encoding params>.gif per clip (same drive as GIF_ROOT_DIR so hits are hard links)
+CONVERSION_CACHE_MAX_GB = 5  # Least recently used cache clips are deleted beyond this
+CONVERSION_MARKER = ".conversion.json"  # Written into each GIF folder: source path/ID/hash, settings and upload status
+MANIFEST_ENABLED = True  # Journal each video's progress so an interrupted run resumes where it stopped
+MANIFEST_DIR = r"D:\downloads\manifests"  # One <url hash>.jsonl journal per video (delete one to redo that video)
+DOWNLOADS_DIR = r"D:\downloads"  # Where yt-dlp saves the videos
+GIF_ROOT_DIR = r"C:\Users\harip\ALL TEST"  # Where the <title>[<video id>].gifs folders are created
+STORAGE_BUDGET_GB = None  # Max size of downloaded videos + .gifs folders + conversion cache; fully uploaded work is evicted beyond it (None = off)
+RETENTION_ORDER = "uploaded"  # Evict oldest first by "uploaded" (upload completion time) or "lru" (last access)
+TIMING_ENABLED = True  # Write every timing span as a JSON line (the end-of-run report is printed either way)
+TIMING_LOG_DIR = r"D:\downloads\timings"  # One run_<timestamp>.jsonl of timing spans per run
+TIMING_SLOWEST_UNITS = 5  # Slowest per-video stages listed in the report
+PROBE_CACHE_PATH = r"D:\downloads\probe_cache.json"  # Persistent ffprobe results keyed by path/size/mtime
+TAG_CACHE_PATH = r"D:\downloads\tag_cache.json"  # Persistent LLM tags keyed by video ID + prompt/model hash
+TAG_CACHE_TTL_DAYS = 30  # Cached tags older than this are generated again
+TAG_CACHE_MAX_ENTRIES = 2000  # Least recently used entries are dropped beyond this
+WAIT_POLL_INTERVAL = 0.25  # Seconds between checks in the wait_* helpers
+UI_SETTLE_DELAY = 0.2  # Short pause after a click/keypress that has no observable condition
+PAGE_LOAD_TIMEOUT = 20  # Max seconds to wait for the Tenor page to load
+UPLOAD_TIMEOUT = 45  # Max seconds to wait for a batch upload to finish
+START_COUNTDOWN_SECONDS = 3  # Countdown before automation takes over mouse/keyboard
+TENOR_PAGE_REGION = (0, 120, 1920, 900)  # Screen area watched to detect page loads/changes
+BATCH_SIZE_INITIAL = 3  # First batch size for the pyautogui uploader (was the fixed size)
+BATCH_SIZE_MIN = 1  # Batch planner never goes below this
+BATCH_SIZE_MAX = 3  # ...or above this (never more than the TAG_LAYOUT can tag)
+TAG_LAYOUT = "fields"  # Tag form routine: "fields" (3 files per batch) or "scroll" (10 files per batch, see TAG_LAYOUTS)
+BATCH_MAX_BYTES = 40 * 1024 * 1024  # Max total GIF bytes per batch
+BATCH_MAX_SECONDS = 120  # Max predicted seconds per batch (keeps each submission under site timeouts)
+BATCH_RETRIES = 1  # Times a failed batch's files are re-queued (in smaller batches)
+UPLOAD_BACKEND = "pyautogui"  # "pyautogui" (drive the browser), "http" (POST the files) or "browser" (headless DOM automation)
+DOWNLOADER = "yt_dlp"  # "yt_dlp" or "pytubefix" (see DOWNLOADERS)
+TAGGER = "gemini"  # "gemini" or "cerebras" (see TAGGERS)
+ENCODER = "plain"  # "plain" or "logo" (LOGO_PATH watermark in the bottom-right corner of every GIF)
+LOGO_PATH = "KRHP LOGO .png"  # Watermark for the "logo" encoder
+LOGO_WIDTH = 80  # Watermark width in pixels
+LOGO_OPACITY = 0.3  # Watermark opacity (0.3 = 70% transparent)
+BROWSER = "opera"  # Browser the "pyautogui" backend opens Tenor in: "opera" or "chrome"
+CEREBRAS_API_KEY = ""  # Key for the "cerebras" tagger
+TAG_MODEL_NAME = "llama-3.3-70b"  # Cerebras model used for tag generation
+TAG_BATCH_SIZE = 10  # Videos per batched Cerebras tag request (see prefetch_tags_in_background)
+UNIVERSAL_TAG = None  # Appended to every Cerebras tag list when set, e.g. "#HariPrajwal"
+HTTP_UPLOAD_URL = "https://upload.giphy.com/v1/gifs"  # Multipart endpoint for the "http" backend (a local mock works too)
+HTTP_UPLOAD_API_KEY = os.environ.get("GIPHY_API_KEY", "")  # Sent as the api_key form field (or --http-api-key)
+HTTP_UPLOAD_WORKERS = 4  # Concurrent HTTP uploads
+HTTP_UPLOAD_RETRIES = 3  # Attempts per GIF before giving up
+HTTP_UPLOAD_TIMEOUT = 60  # Seconds per HTTP request
+BROWSER_UPLOAD_URL = "https://tenor.com/gif-maker?utm_source=nav-bar&utm_medium=internal&utm_campaign=gif-maker-entrypoints"  # Form page for the "browser" backend (a local HTML copy works too)
+BROWSER_SESSIONS = 3  # Headless browser sessions uploading in parallel
+BROWSER_BATCH_SIZE = 10  # GIFs handed to the file input per form submission
+BROWSER_HEADLESS = True  # False to watch the sessions work
+BROWSER_PROFILE_DIR = r"C:\Users\harip\ALL TEST\browser_profiles"  # One logged-in profile per session: <dir>\session_<n>
+BROWSER_TIMEOUT_MS = 60000  # Max wait for any selector / upload confirmation
+BROWSER_SELECTORS = {
+    "file_input": "input[type=file]",  # File input behind the upload area
+    "tag_input": "input[placeholder*='tag' i]",  # Every tag field on the form
+    "submit": "button:has-text('Upload')",  # Submit button
+    "done": "text=/upload(ed)? (complete|successful)/i",  # Shown once the batch is accepted
+}
+
+_probe_cache = None  # Loaded lazily from PROBE_CACHE_PATH
+_probe_cache_lock = threading.Lock()
+_tag_cache_lock = threading.Lock()
+_logo_fallback_paths = set()  # GIFs the "logo" encoder had to make without the watermark
+_logo_fallback_lock = threading.Lock()
+_hash_index = None  # Loaded lazily from HASH_INDEX_PATH
+_hash_index_lock = threading.Lock()
+_download_clients = {}  # One reusable YoutubeDL client per download thread (keyed by thread id)
+_download_clients_lock = threading.Lock()
+
+class RunTimer:
+    """
+    Timing spans for one run. Every span (stage + sub-step, including fixed
+    sleeps) is appended as one JSON line to TIMING_LOG_DIR\\run_<id>.jsonl and
+    kept in memory for report() at the end of the run. Counters (GIFs, bytes)
+    feed the throughput figures. Safe to use from the pipeline threads.
+    """
+
+    def __init__(self):
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(TIMING_LOG_DIR, f"run_{self.run_id}.jsonl")
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self._local = threading.local()  # Per-thread stack of open spans (for "parent")
+        self._lock = threading.Lock()
+
+    def _write(self, record):
+        if not TIMING_ENABLED:
+            return
+        try:
+            os.makedirs(TIMING_LOG_DIR, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError:
+            pass  # Timing must never break a run
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """Time the with-block as one span of stage (extra fields go into the record)"""
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(stage)
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            stack.pop()
+            record = {"run": self.run_id, "stage": stage, "parent": parent,
+                      "start": round(start - self.started, 3), "seconds": round(time.perf_counter() - start, 3),
+                      "thread": threading.current_thread().name, "ok": ok, **fields}
+            with self._lock:
+                self.spans.append(record)
+                self._write(record)
+
+    def count(self, name, amount=1):
+        """Add to a run counter: gifs_created, gifs_uploaded, bytes_downloaded, bytes_converted"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stage_seconds(self, stage):
+        return sum(span["seconds"] for span in self.spans if span["stage"] == stage)
+
+    def report(self):
+        """Print the time breakdown, throughput and slowest units; also logged as a "report" line"""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        wall = time.perf_counter() - self.started
+
+        breakdown = {}
+        for span in spans:
+            entry = breakdown.setdefault(span["stage"], {"count": 0, "seconds": 0.0, "max": 0.0, "parents": []})
+            if span["parent"] and span["parent"] not in entry["parents"]:
+                entry["parents"].append(span["parent"])
+            entry["count"] += 1
+            entry["seconds"] += span["seconds"]
+            entry["max"] = max(entry["max"], span["seconds"])
+
+        download_seconds = self.stage_seconds("download")
+        convert_seconds = self.stage_seconds("convert")
+        throughput = {
+            "gifs_per_hour_created": round(counters.get("gifs_created", 0) / wall * 3600, 1) if wall else 0.0,
+            "gifs_per_hour_uploaded": round(counters.get("gifs_uploaded", 0) / wall * 3600, 1) if wall else 0.0,
+            "download_mb_per_s": round(counters.get("bytes_downloaded", 0) / 1024 ** 2 / download_seconds, 2) if download_seconds else None,
+            "convert_mb_per_s": round(counters.get("bytes_converted", 0) / 1024 ** 2 / convert_seconds, 2) if convert_seconds else None,
+        }
+        # Units = one video going through one top-level stage
+        units = sorted((span for span in spans if span.get("unit")), key=lambda span: span["seconds"], reverse=True)
+        slowest = [{"stage": span["stage"], "unit": span["unit"], "seconds": span["seconds"]}
+                   for span in units[:TIMING_SLOWEST_UNITS]]
+
+        print(f"\n{'='*60}")
+        print(f"⏱ PERFORMANCE REPORT (run {self.run_id}, {wall:.1f}s wall clock)")
+        print(f"{'='*60}")
+        print(f"{'stage':<22}{'parent':<16}{'count':>7}{'total s':>10}{'max s':>9}{'% wall':>8}")
+        for stage, entry in sorted(breakdown.items(), key=lambda item: item[1]["seconds"], reverse=True):
+            share = entry["seconds"] / wall * 100 if wall else 0.0
+            print(f"{stage:<22}{','.join(entry['parents']) or '-':<16}{entry['count']:>7}{entry['seconds']:>10.1f}"
+                  f"{entry['max']:>9.1f}{share:>7.1f}%")
+        print("(sub-steps are also counted in their parent; spans in pipeline threads overlap)")
+        print(f"📈 GIFs/hour: {throughput['gifs_per_hour_created']} created, {throughput['gifs_per_hour_uploaded']} uploaded")
+        if throughput["download_mb_per_s"] is not None:
+            print(f"📥 Download: {throughput['download_mb_per_s']} MB/s")
+        if throughput["convert_mb_per_s"] is not None:
+            print(f"🔄 Conversion: {throughput['convert_mb_per_s']} MB/s of source video")
+        if slowest:
+            print("🐢 Slowest units:")
+            for unit in slowest:
+                print(f"   {unit['seconds']:>8.1f}s  {unit['stage']:<10} {unit['unit']}")
+        if TIMING_ENABLED:
+            print(f"📝 Timing spans: {self.path}")
+
+        report = {"run": self.run_id, "event": "report", "wall_seconds": round(wall, 3),
+                  "stages": {stage: {key: round(value, 3) if isinstance(value, float) else value
+                                     for key, value in entry.items()} for stage, entry in breakdown.items()},
+                  "counters": counters, "throughput": throughput, "slowest": slowest}
+        with self._lock:
+            self._write(report)
+        return report
+
+TIMER = RunTimer()
+
+def timed(stage):
+    """Decorator: run the function inside a TIMER span named stage"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with TIMER.span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def pause(seconds, reason):
+    """A fixed sleep, recorded as a "sleep" span so idle time shows up in the report"""
+    with TIMER.span("sleep", reason=reason, planned=seconds):
+        time.sleep(seconds)
+
+# Optional packages each strategy needs: (setting, value) -> [(module, pip package)].
+# Imported only inside the functions that use them; checked up front by missing_backends.
+BACKEND_PACKAGES = {
+    ("DOWNLOADER", "yt_dlp"): [("yt_dlp", "yt-dlp")],
+    ("DOWNLOADER", "pytubefix"): [("pytubefix", "pytubefix")],
+    ("TAGGER", "gemini"): [("google.generativeai", "google-generativeai")],
+    ("TAGGER", "cerebras"): [("cerebras.cloud.sdk", "cerebras-cloud-sdk")],
+    ("UPLOAD_BACKEND", "pyautogui"): [("pyautogui", "pyautogui"), ("pyperclip", "pyperclip"), ("pywinauto", "pywinauto")],
+    ("UPLOAD_BACKEND", "browser"): [("playwright", "playwright")],
+    ("DEDUP_ENABLED", True): [("numpy", "numpy")],
+}
+
+# Settings whose backends each stage needs
+STAGE_SETTINGS = {
+    "download": ["DOWNLOADER"],
+    "convert": ["DEDUP_ENABLED"],
+    "upload": ["TAGGER", "UPLOAD_BACKEND"],
+}
+
+def module_available(module):
+    """True if module can be imported - checked without importing it"""
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ImportError:  # Parent package missing
+        return False
+    except ValueError:  # Already imported without a spec (e.g. set up by hand in sys.modules)
+        return module in sys.modules
+
+def missing_backends(stages=("download", "convert", "upload")):
+    """
+    Everything the configured strategies need for these stages that is not
+    installed, as a list of "what (install hint)" lines. Nothing is imported.
+    """
+    missing = []
+    if "convert" in stages:
+        for tool in ("ffmpeg", "ffprobe"):
+            if shutil.which(tool) is None:
+                missing.append(f"{tool} (not on PATH)")
+    if "upload" in stages and UPLOAD_BACKEND == "http" and not HTTP_UPLOAD_API_KEY:
+        missing.append("HTTP_UPLOAD_API_KEY for UPLOAD_BACKEND=http (--http-api-key or the GIPHY_API_KEY environment variable)")
+    for stage in stages:
+        for setting in STAGE_SETTINGS.get(stage, []):
+            value = globals()[setting]
+            for module, package in BACKEND_PACKAGES.get((setting, value), []):
+                if not module_available(module):
+                    missing.append(f"{module} for {setting}={value} (pip install {package})")
+    return missing
+
+def extract_urls_from_input(user_input):
+    """
+    Extract multiple URLs from user input using space or comma separation
+    AND handle continuous links without separators
+    """
+    urls = []
+    
+    # First, try to find URLs using regex pattern
+    url_pattern = r'https?://[^\s,]+'
+    found_urls = re.findall(url_pattern, user_input)
+    
+    if found_urls:
+        # If regex found URLs, use them
+        urls = found_urls
+    else:
+        # Fallback: split by both commas and spaces
+        raw_urls = re.split(r'[,\s]+', user_input)
+        
+        for url in raw_urls:
+            url = url.strip()
+            # Basic URL validation
+            if url and (url.startswith('http://') or url.startswith('https://')):
+                urls.append(url)
+    
+    return urls
+
+def check_existing_gifs(output_dir):
+    """
+    Check if GIF files already exist in the output directory
+    Returns: (bool_exists, int_count)
+    """
+    if not os.path.exists(output_dir):
+        return False, 0
+    
+    try:
+        gif_files = [f for f in os.listdir(output_dir) if f.endswith('.gif') and f.startswith('output_')]
+        
+        if gif_files:
+            print(f"📁 Found {len(gif_files)} existing GIF files in directory")
+            return True, len(gif_files)
+        
+        return False, 0
+    except Exception as e:
+        print(f"⚠️  Error checking existing GIFs: {e}")
+        return False, 0
+
+def sanitize_filename(name):
+    """
+    Sanitize filename to remove invalid characters and limit length
+    MORE ROBUST HANDLING FOR COMPLEX FILENAMES
+    """
+    if not name:
+        return "Unknown_Video"
+    
+    # Replace multiple spaces with single space
+    name = re.sub(r'\s+', ' ', name)
+    
+    # Remove invalid characters for Windows filenames
+    invalid_chars = '<>:"/\\|?*'
+    for char in invalid_chars:
+        name = name.replace(char, '')
+    
+    # Limit length to avoid Windows path issues - INCREASED FOR LONG NAMES
+    if len(name) > 150:  # Increased from 100 to 150
+        # Try to keep important parts of the name
+        name = name[:150]
+    
+    # Remove any leading/trailing spaces, dots, or hyphens
+    name = name.strip().strip('.').strip('-')
+    
+    # If name becomes empty after sanitization, use default
+    if not name:
+        name = "Unknown_Video"
+    
+    return name
+
+def gif_output_dir_for(video_title, video_path=None):
+    """
+    Output folder for a video: sanitized title without spaces + [video ID] + .gifs.
+    The ID keeps two videos with the same title out of each other's folder
+    (a short content hash stands in when the file name carries no ID).
+    """
+    folder_name = sanitize_filename(video_title.replace(" ", ""))
+    if video_path:
+        folder_name += f"[{extract_video_id(video_path) or source_fingerprint(video_path)[:12]}]"
+    return os.path.join(GIF_ROOT_DIR, folder_name + ".gifs")
+
+def robust_directory_creation(directory_path):
+    """
+    More robust directory creation that handles various edge cases
+    """
+    try:
+        if not os.path.exists(directory_path):
+            os.makedirs(directory_path, exist_ok=True)
+            print(f"📂 Created directory: {directory_path}")
+        else:
+            print(f"📂 Using existing directory: {directory_path}")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create directory {directory_path}: {e}")
+        # Fallback: try to create in a simpler location
+        try:
+            fallback_dir = r"C:\Users\harip\ALL TEST\Fallback_GIFs"
+            os.makedirs(fallback_dir, exist_ok=True)
+            print(f"📂 Using fallback directory: {fallback_dir}")
+            return fallback_dir
+        except:
+            print("❌ Critical: Could not create any directory")
+            return False
+
+def gif_download_ranges(skip_start, skip_end):
+    """
+    yt-dlp download_ranges callback that fetches only the part of the video
+    that will become GIFs (everything except the first skip_start and last
+    skip_end seconds).
+    """
+    def ranges(info_dict, ydl):
+        duration = info_dict.get('duration')
+        if not duration or duration <= skip_start + skip_end:
+            # Unknown or too short - download everything
+            return
+        yield {'start_time': skip_start, 'end_time': duration - skip_end}
+    return ranges
+
+def build_ydl_opts(download_dir, profile=None):
+    """
+    yt-dlp options shared by single and batch downloads.
+    profile "gif": smallest video-only stream at least GIF_TARGET_WIDTH wide, no
+    audio track, optionally limited to DOWNLOAD_SECTION. profile "best": the
+    original bestvideo+bestaudio download.
+    """
+    profile = profile or DOWNLOAD_PROFILE
+    ydl_opts = {
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best', 
+        'outtmpl': os.path.join(download_dir, '%(title)s [%(id)s].%(ext)s'),
+        'noprogress': False, 
+        'noplaylist': True,
+    }
+
+    if profile == "gif":
+        # "+res" sorts ascending, so the first match is the SMALLEST stream that
+        # still satisfies the width filter; fall back to any video-only stream,
+        # then to a muxed one if the site has nothing else
+        ydl_opts['format'] = (
+            f'bv[width>={GIF_TARGET_WIDTH}][ext=mp4]/bv[width>={GIF_TARGET_WIDTH}]'
+            f'/bv[ext=mp4]/bv/b[width>={GIF_TARGET_WIDTH}]/b'
+        )
+        ydl_opts['format_sort'] = ['+res', 'ext:mp4']
+        if DOWNLOAD_SECTION:
+            skip_start, skip_end = DOWNLOAD_SECTION
+            ydl_opts['download_ranges'] = gif_download_ranges(skip_start, skip_end)
+            ydl_opts['force_keyframes_at_cuts'] = True
+
+    return ydl_opts
+
+def get_thread_downloader(download_dir=DOWNLOADS_DIR):
+    """
+    Return this thread's YoutubeDL client, creating it on first use.
+    Reusing the client keeps its HTTP session (cookies, connections, extractor
+    state) alive across URLs instead of rebuilding it for every video.
+    """
+    import yt_dlp
+    thread_id = threading.get_ident()
+    with _download_clients_lock:
+        ydl = _download_clients.get(thread_id)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(build_ydl_opts(download_dir))
+            _download_clients[thread_id] = ydl
+    return ydl
+
+def thread_downloader():
+    """This thread's reusable client for the DOWNLOADER (None if it has none)"""
+    return get_thread_downloader() if DOWNLOADER == "yt_dlp" else None
+
+def close_downloaders():
+    """Close every reusable YoutubeDL client created so far"""
+    with _download_clients_lock:
+        for ydl in _download_clients.values():
+            try:
+                ydl.close()
+            except Exception:
+                pass
+        _download_clients.clear()
+
+def download_video_from_url(url, ydl=None):
+    """
+    Downloads the best quality video from a given URL using yt-dlp.
+    Pass ydl to reuse an existing YoutubeDL client (see get_thread_downloader).
+    Returns the path to the downloaded video file and the video title.
+    """
+    import yt_dlp
+    
+    # Define the directory to save the file
+    download_dir = DOWNLOADS_DIR
+    if not robust_directory_creation(download_dir):
+        return None, None, None, None
+
+    print(f"🎥 Attempting to download: {url}")
+    
+    try:
+        if ydl is not None:
+            # Reused client - keep it open for the next URL
+            info = ydl.extract_info(url, download=True)
+            downloaded_file = ydl.prepare_filename(info)
+        else:
+            # Use YoutubeDL to get video info and download
+            with yt_dlp.YoutubeDL(build_ydl_opts(download_dir)) as ydl:
+                # Extract video info to get the filename and title
+                info = ydl.extract_info(url, download=True)
+                downloaded_file = ydl.prepare_filename(info)
+        video_title = info.get('title', 'Unknown_Title')
+        video_description = info.get('description', '')
+        video_tags = info.get('tags', [])
+        
+        print("✅ Download complete!")
+        return downloaded_file, video_title, video_description, video_tags
+
+    except yt_dlp.utils.DownloadError as e:
+        print(f"❌ An error occurred during download: {e}")
+        return None, None, None, None
+    except Exception as e:
+        print(f"❌ An unexpected error occurred: {e}")
+        return None, None, None, None
+
+def stream_width(stream):
+    """Best-effort pixel width of a pytubefix stream"""
+    width = getattr(stream, 'width', None)
+    if width:
+        return int(width)
+    # Fall back to "720p" style resolution assuming a 16:9 frame
+    match = re.match(r'(\d+)p', getattr(stream, 'resolution', None) or '')
+    return int(match.group(1)) * 16 // 9 if match else 0
+
+def select_gif_stream(yt):
+    """
+    Pick the smallest video-only mp4 stream at or above GIF_TARGET_WIDTH.
+    Falls back to the highest resolution progressive stream if no adaptive
+    video-only stream qualifies.
+    """
+    video_streams = [
+        stream for stream in yt.streams.filter(adaptive=True, only_video=True, file_extension='mp4')
+        if stream_width(stream) >= GIF_TARGET_WIDTH
+    ]
+    if video_streams:
+        stream = min(video_streams, key=stream_width)
+        print(f"🎯 Using video-only stream: {getattr(stream, 'resolution', '?')} (no audio)")
+        return stream
+    return yt.streams.get_highest_resolution()
+
+def download_with_pytubefix(url, ydl=None):
+    """
+    DOWNLOADER "pytubefix": same contract as download_video_from_url.
+    ydl is accepted for a uniform signature and ignored (pytubefix has no
+    reusable client). DOWNLOAD_PROFILE "gif" picks the smallest adequate
+    video-only stream; DOWNLOAD_SECTION does not apply.
+    """
+    from pytubefix import YouTube
+    from pytubefix.cli import on_progress
+
+    download_dir = DOWNLOADS_DIR
+    if not robust_directory_creation(download_dir):
+        return None, None, None, None
+
+    print(f"🎥 Attempting to download: {url}")
+    
+    try:
+        yt = YouTube(url, on_progress_callback=on_progress)
+        if DOWNLOAD_PROFILE == "gif":
+            stream = select_gif_stream(yt)
+        else:
+            stream = yt.streams.get_highest_resolution()
+        
+        # Same "<title> [<id>].<ext>" naming as yt-dlp, so extract_video_id works
+        filename = f"{sanitize_filename(yt.title)} [{yt.video_id}].mp4"
+        file_path = os.path.join(download_dir, filename)
+        
+        print("📥 Downloading video...")
+        stream.download(output_path=download_dir, filename=filename)
+        
+        video_tags = yt.keywords if hasattr(yt, 'keywords') else []
+        print("✅ Download complete!")
+        return file_path, yt.title, yt.description, video_tags
+
+    except Exception as e:
+        print(f"❌ An error occurred during download: {e}")
+        return None, None, None, None
+
+DOWNLOADERS = {
+    "yt_dlp": download_video_from_url,
+    "pytubefix": download_with_pytubefix,
+}
+
+def download_videos_batch(urls, max_workers=None):
+    """
+    Download many URLs concurrently (up to max_workers at once, default
+    DOWNLOAD_WORKERS) with the DOWNLOADER, reusing one YoutubeDL client per
+    worker thread for "yt_dlp".
+    Returns a list of (path, title, description, tags) tuples in the SAME
+    order as urls; failed downloads are (None, None, None, None).
+    """
+    max_workers = max_workers or DOWNLOAD_WORKERS
+    print(f"📥 Downloading {len(urls)} video(s) with up to {max_workers} parallel downloads...")
+
+    results = [(None, None, None, None)] * len(urls)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(lambda u: DOWNLOADERS[DOWNLOADER](u, ydl=thread_downloader()), url): index
+                for index, url in enumerate(urls)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"❌ Download failed for {urls[index]}: {e}")
+    finally:
+        close_downloaders()
+
+    downloaded = sum(1 for result in results if result[0])
+    print(f"📊 Downloaded {downloaded}/{len(urls)} videos")
+    return results
+
+def load_probe_cache():
+    """Load the persistent probe cache from disk (once per run)"""
+    global _probe_cache
+    if _probe_cache is None:
+        try:
+            with open(PROBE_CACHE_PATH, "r", encoding="utf-8") as f:
+                _probe_cache = json.load(f)
+        except (OSError, ValueError):
+            _probe_cache = {}
+    return _probe_cache
+
+def save_probe_cache():
+    """Write the probe cache back to disk atomically"""
+    try:
+        os.makedirs(os.path.dirname(PROBE_CACHE_PATH), exist_ok=True)
+        temp_path = PROBE_CACHE_PATH + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(_probe_cache, f, indent=1)
+        os.replace(temp_path, PROBE_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not save probe cache: {e}")
+
+def parse_frame_rate(rate):
+    """Turn ffprobe's "30000/1001" style frame rate into a float"""
+    try:
+        if "/" in rate:
+            num, den = rate.split("/", 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except (TypeError, ValueError):
+        return 0.0
+
+@timed("ffprobe")
+def run_ffprobe(video_path):
+    """
+    Probe format AND streams in ONE ffprobe call.
+    Returns a dict with duration, width, height, fps, codec, has_audio and streams.
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_format", "-show_streams",
+         "-of", "json", video_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    data = json.loads(result.stdout or "{}")
+    streams = data.get("streams", [])
+    video_stream = next((st for st in streams if st.get("codec_type") == "video"), {})
+
+    duration = data.get("format", {}).get("duration") or video_stream.get("duration")
+    return {
+        "duration": float(duration),
+        "width": int(video_stream.get("width", 0)),
+        "height": int(video_stream.get("height", 0)),
+        "fps": parse_frame_rate(video_stream.get("avg_frame_rate") or video_stream.get("r_frame_rate")),
+        "codec": video_stream.get("codec_name", ""),
+        "has_audio": any(st.get("codec_type") == "audio" for st in streams),
+        "streams": [
+            {
+                "index": st.get("index"),
+                "codec_type": st.get("codec_type"),
+                "codec_name": st.get("codec_name"),
+                "width": st.get("width"),
+                "height": st.get("height"),
+                "avg_frame_rate": st.get("avg_frame_rate"),
+                "bit_rate": st.get("bit_rate"),
+            }
+            for st in streams
+        ],
+    }
+
+def probe_video(video_path):
+    """
+    Return cached ffprobe metadata for video_path, probing only when the file
+    is new or its size/mtime changed since the last run.
+    Raises ValueError / SubprocessError if the file cannot be probed.
+    """
+    stat = os.stat(video_path)
+    key = os.path.abspath(video_path)
+
+    with _probe_cache_lock:
+        cache = load_probe_cache()
+        entry = cache.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            print("⚡ Using cached video metadata")
+            return entry["info"]
+
+    info = run_ffprobe(video_path)
+
+    with _probe_cache_lock:
+        cache = load_probe_cache()
+        cache[key] = {"size": stat.st_size, "mtime": stat.st_mtime, "info": info}
+        save_probe_cache()
+    return info
+
+@timed("scene_analysis")
+def run_scene_analysis(video_path, duration):
+    """
+    ONE low-resolution ffmpeg pass that reports shot changes (scene score),
+    black segments (blackdetect) and frozen/static segments (freezedetect).
+    Returns {"cuts": [t, ...], "black": [(start, end), ...], "static": [(start, end), ...]}.
+    """
+    command = [
+        "ffmpeg", "-hide_banner", "-nostats", "-i", video_path, "-an",
+        "-vf", (
+            "scale=160:-2,"
+            "blackdetect=d=0.3:pix_th=0.10,"
+            "freezedetect=n=0.003:d=1,"
+            f"select='gt(scene,{SCENE_THRESHOLD})',showinfo"
+        ),
+        "-f", "null", "-"
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="replace")
+
+    cuts, black, static = [], [], []
+    freeze_start = None
+    for line in result.stderr.splitlines():
+        if "showinfo" in line and "pts_time:" in line:
+            match = re.search(r"pts_time:\s*([\d.]+)", line)
+            if match:
+                cuts.append(float(match.group(1)))
+        elif "black_start:" in line:
+            match = re.search(r"black_start:\s*([\d.]+)\s+black_end:\s*([\d.]+)", line)
+            if match:
+                black.append((float(match.group(1)), float(match.group(2))))
+        elif "freeze_start:" in line:
+            match = re.search(r"freeze_start:\s*([\d.]+)", line)
+            if match:
+                freeze_start = float(match.group(1))
+        elif "freeze_end:" in line and freeze_start is not None:
+            match = re.search(r"freeze_end:\s*([\d.]+)", line)
+            if match:
+                static.append((freeze_start, float(match.group(1))))
+                freeze_start = None
+
+    # A freeze that lasts until the end of the video never reports freeze_end
+    if freeze_start is not None:
+        static.append((freeze_start, duration))
+
+    if result.returncode != 0 and not (cuts or black or static):
+        raise subprocess.SubprocessError(result.stderr[-200:])
+    return {"cuts": sorted(cuts), "black": black, "static": static}
+
+def get_scene_analysis(video_path, duration):
+    """
+    Scene analysis for video_path, cached in the probe cache next to the
+    ffprobe metadata so it runs only once per source file.
+    Returns None if the analysis fails.
+    """
+    key = os.path.abspath(video_path)
+    stat = os.stat(video_path)
+    with _probe_cache_lock:
+        entry = load_probe_cache().get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime and "scenes" in entry:
+            print("⚡ Using cached scene analysis")
+            return entry["scenes"]
+
+    print("🎬 Detecting shot changes, black and static segments...")
+    try:
+        analysis = run_scene_analysis(video_path, duration)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"⚠️  Scene analysis failed: {e}")
+        return None
+    print(f"✅ Found {len(analysis['cuts'])} shot changes, {len(analysis['black'])} black and "
+          f"{len(analysis['static'])} static segments")
+
+    with _probe_cache_lock:
+        cache = load_probe_cache()
+        entry = cache.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            entry["scenes"] = analysis
+            save_probe_cache()
+    return analysis
+
+def plan_fixed_clips(duration, clip_length, skip=0):
+    """
+    Original slicing: one clip every clip_length seconds between skip and
+    duration - skip -> [(start, length), ...]
+    """
+    num_clips = math.ceil((duration - 2 * skip) / clip_length)
+    return [(skip + i * clip_length, clip_length) for i in range(num_clips)]
+
+def overlap_seconds(start, end, segments):
+    """Total seconds of [start, end) covered by the (start, end) segments"""
+    return sum(max(0.0, min(end, seg_end) - max(start, seg_start)) for seg_start, seg_end in segments)
+
+def plan_scene_clips(duration, analysis, clip_length, skip=0):
+    """
+    Place clips inside shots so no GIF straddles a cut: each shot is sliced
+    into clip_length pieces from its first frame, leftovers shorter than
+    SCENE_MIN_CLIP_LENGTH are skipped, and clips that are mostly black or
+    mostly static are dropped. The first and last skip seconds are left out.
+    Returns [(start, length), ...] in time order.
+    """
+    first, last = float(skip), duration - skip
+    bounds = [first] + [cut for cut in analysis["cuts"] if first < cut < last] + [last]
+
+    clips = []
+    dropped_black = dropped_static = 0
+    for shot_start, shot_end in zip(bounds, bounds[1:]):
+        start = shot_start
+        while shot_end - start >= SCENE_MIN_CLIP_LENGTH:
+            length = min(clip_length, shot_end - start)
+            end = start + length
+            if overlap_seconds(start, end, analysis["black"]) > length * SCENE_MAX_BLACK_RATIO:
+                dropped_black += 1
+            elif overlap_seconds(start, end, analysis["static"]) > length * SCENE_MAX_STATIC_RATIO:
+                dropped_static += 1
+            else:
+                clips.append((round(start, 3), round(length, 3)))
+            start = end
+
+    print(f"🎯 Scene plan: {len(clips)} clips across {len(bounds) - 1} shots "
+          f"(dropped {dropped_black} black, {dropped_static} static)")
+    return clips
+
+def active_logo_path():
+    """LOGO_PATH when the "logo" encoder is selected and the file exists, else None"""
+    if ENCODER == "logo" and os.path.exists(LOGO_PATH):
+        return LOGO_PATH
+    return None
+
+def frames_filter(fps, logo_input=None):
+    """
+    Filter chain from the source frames ([0:v]) to the scaled GIF frames.
+    With logo_input (the input index of the logo image) the watermark is
+    overlaid in the bottom-right corner at LOGO_WIDTH / LOGO_OPACITY.
+    """
+    chain = f"[0:v]fps={fps},scale=480:-1:flags=lanczos"
+    if logo_input is None:
+        return chain
+    return (f"{chain}[v];[{logo_input}:v]scale={LOGO_WIDTH}:-1,format=rgba,colorchannelmixer=aa={LOGO_OPACITY}[logo];"
+            f"[v][logo]overlay=main_w-overlay_w-10:main_h-overlay_h-10")
+
+@timed("palette")
+def generate_palette(video_path, output_dir, start=0, duration=None):
+    """
+    Build ONE optimized 256-colour palette for the whole video (first pass of
+    palettegen/paletteuse). Frames are sampled at PALETTE_SAMPLE_FPS so the
+    extra pass stays cheap. Returns the palette path or None on failure.
+    """
+    palette_path = os.path.join(output_dir, PALETTE_FILENAME)
+    logo_path = active_logo_path()
+    command = ["ffmpeg", "-y", "-ss", str(start)]
+    if duration:
+        command += ["-t", str(duration)]
+    command += ["-i", video_path]
+    # The watermark is part of every frame, so its colours belong in the palette
+    if logo_path:
+        command += ["-i", logo_path]
+    command += [
+        "-filter_complex", frames_filter(PALETTE_SAMPLE_FPS, 1 if logo_path else None) + ",palettegen=max_colors=256:stats_mode=full",
+        "-frames:v", "1",
+        palette_path
+    ]
+
+    print("🎨 Building optimized palette for this video...")
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0 and os.path.exists(palette_path):
+            print(f"✅ Palette saved: {palette_path}")
+            return palette_path
+        print(f"⚠️  Palette generation failed - {result.stderr[:100]}")
+    except Exception as e:
+        print(f"❌ Error generating palette: {e}")
+    return None
+
+def build_clip_command(video_path, output_path, start, clip_length, fps, palette_path=None, use_logo=True):
+    """Build the ffmpeg command that converts one clip into one GIF (use_logo=False skips the watermark)"""
+    logo_path = active_logo_path() if use_logo else None
+    if palette_path:
+        # Second pass: map the clip onto the shared per-video palette
+        command = [
+            "ffmpeg", "-y",
+            "-ss", str(start),
+            "-t", str(clip_length),
+            "-i", video_path,
+            "-i", palette_path,
+        ]
+        if logo_path:
+            command += ["-i", logo_path]
+        return command + [
+            "-filter_complex", frames_filter(fps, 2 if logo_path else None) + "[x];[x][1:v]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle",
+            output_path
+        ]
+    if logo_path:
+        return [
+            "ffmpeg", "-y",
+            "-ss", str(start),
+            "-t", str(clip_length),
+            "-i", video_path,
+            "-i", logo_path,
+            "-filter_complex", frames_filter(fps, 1) + "[x]",
+            "-map", "[x]",
+            output_path
+        ]
+    return [
+        "ffmpeg", "-y",             
+        "-ss", str(start),          
+        "-t", str(clip_length),     
+        "-i", video_path,           
+        "-vf", f"fps={fps},scale=480:-1:flags=lanczos", 
+        output_path
+    ]
+
+@timed("ffmpeg_clip")
+def convert_single_clip(video_path, output_path, start, clip_length, fps, palette_path=None):
+    """
+    Convert one clip with its own ffmpeg process. If the watermarked command
+    fails, the clip is retried without the logo (and kept out of the
+    conversion cache, see without_logo).
+    Returns: (bool_success, str_error)
+    """
+    ok, error = run_clip_command(build_clip_command(video_path, output_path, start, clip_length, fps, palette_path))
+    if ok or not active_logo_path():
+        return ok, error
+
+    print(f"🔄 Trying fallback without logo for {os.path.basename(output_path)}...")
+    ok, error = run_clip_command(build_clip_command(video_path, output_path, start, clip_length, fps, palette_path, use_logo=False))
+    if ok:
+        with _logo_fallback_lock:
+            _logo_fallback_paths.add(os.path.abspath(output_path))
+    return ok, error
+
+def run_clip_command(command):
+    """Run one per-clip ffmpeg command. Returns: (bool_success, str_error)"""
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0:
+            return True, ""
+        return False, result.stderr[:100]
+    except Exception as e:
+        return False, str(e)
+
+def without_logo(gif_path):
+    """True (once) if gif_path was made by the no-logo fallback"""
+    with _logo_fallback_lock:
+        key = os.path.abspath(gif_path)
+        if key in _logo_fallback_paths:
+            _logo_fallback_paths.discard(key)
+            return True
+    return False
+
+def build_single_pass_command(video_path, output_dir, first_clip, clips, fps, palette_path=None):
+    """
+    Build ONE ffmpeg command that decodes the source once and fans the frames
+    out into one GIF per clip (split + trim in a single filter graph).
+    clips is a list of (start, length) in seconds, in output order.
+    first_clip is the 1-based number of the first output_N.gif in this group.
+    With palette_path every clip is mapped onto that shared palette; with the
+    "logo" encoder the watermark is overlaid before the split.
+    """
+    group_start = min(start for start, _ in clips)
+    group_length = round(max(start + length for start, length in clips) - group_start, 3)
+    clip_count = len(clips)
+    logo_path = active_logo_path()
+    logo_input = (2 if palette_path else 1) if logo_path else None
+
+    # Decode, resample and scale ONCE, then split the stream for every clip
+    split_labels = "".join(f"[s{j}]" for j in range(clip_count))
+    graph = [f"{frames_filter(fps, logo_input)},split={clip_count}{split_labels}"]
+    if palette_path:
+        palette_labels = "".join(f"[p{j}]" for j in range(clip_count))
+        graph.append(f"[1:v]split={clip_count}{palette_labels}")
+    for j, (start, clip_length) in enumerate(clips):
+        offset = round(start - group_start, 3)
+        if palette_path:
+            graph.append(f"[s{j}]trim=start={offset}:duration={clip_length},setpts=PTS-STARTPTS[t{j}]")
+            graph.append(f"[t{j}][p{j}]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle[o{j}]")
+        else:
+            graph.append(f"[s{j}]trim=start={offset}:duration={clip_length},setpts=PTS-STARTPTS[o{j}]")
+
+    command = [
+        "ffmpeg", "-y",
+        "-ss", str(group_start),
+        "-t", str(group_length),
+        "-i", video_path,
+    ]
+    if palette_path:
+        command += ["-i", palette_path]
+    if logo_path:
+        command += ["-i", logo_path]
+    command += ["-filter_complex", ";".join(graph)]
+    for j in range(clip_count):
+        command += ["-map", f"[o{j}]", os.path.join(output_dir, f"output_{first_clip + j}.gif")]
+    return command
+
+def convert_clips_single_pass(video_path, output_dir, clips, fps, palette_path=None, group_size=SINGLE_PASS_GROUP_SIZE):
+    """
+    Convert all (start, length) clips with one decode pass per group of clips.
+    Clips missing after their group finished are retried one by one.
+    Returns the number of GIFs created.
+    """
+    successful_conversions = 0
+    for group_offset in range(0, len(clips), group_size):
+        group_clips = clips[group_offset:group_offset + group_size]
+        first_clip = group_offset + 1
+        last_clip = group_offset + len(group_clips)
+        print(f"🎞 Single pass: output_{first_clip}.gif to output_{last_clip}.gif...")
+
+        # Remove stale GIFs so only files written by this run count as saved
+        for clip_number in range(first_clip, last_clip + 1):
+            stale_path = os.path.join(output_dir, f"output_{clip_number}.gif")
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+        command = build_single_pass_command(video_path, output_dir, first_clip, group_clips, fps, palette_path)
+        try:
+            with TIMER.span("ffmpeg_group", clips=len(group_clips)):
+                result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if result.returncode != 0:
+                print(f"⚠️  Single pass failed for this group - {result.stderr[:100]}")
+        except Exception as e:
+            print(f"❌ Error running single pass: {e}")
+
+        for j, (start, clip_length) in enumerate(group_clips):
+            clip_number = first_clip + j
+            output_path = os.path.join(output_dir, f"output_{clip_number}.gif")
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                print(f"✅ Saved: output_{clip_number}.gif")
+                successful_conversions += 1
+                continue
+
+            # Fall back to the per-clip command for anything the group missed
+            print(f"🔄 Retrying output_{clip_number}.gif on its own...")
+            ok, error = convert_single_clip(video_path, output_path, start, clip_length, fps, palette_path)
+            if ok:
+                print(f"✅ Saved (retry): output_{clip_number}.gif")
+                successful_conversions += 1
+            else:
+                print(f"⚠️  Failed to create: output_{clip_number}.gif - {error}")
+
+    return successful_conversions
+
+def convert_clips_per_clip(video_path, output_dir, clips, fps, palette_path=None):
+    """
+    Convert every (start, length) clip with its own ffmpeg process (original behaviour).
+    Returns the number of GIFs created.
+    """
+    successful_conversions = 0
+    for i, (start, clip_length) in enumerate(clips):
+        output_path = os.path.join(output_dir, f"output_{i+1}.gif")
+        ok, error = convert_single_clip(video_path, output_path, start, clip_length, fps, palette_path)
+        if ok:
+            print(f"✅ Saved: output_{i+1}.gif")
+            successful_conversions += 1
+        else:
+            print(f"⚠️  Failed to create: output_{i+1}.gif - {error}")
+    return successful_conversions
+
+def convert_clips_parallel(video_path, output_dir, clips, fps, palette_path=None, max_workers=None):
+    """
+    Convert clips concurrently with a bounded pool of ffmpeg processes.
+    Every clip keeps its own output_{i+1}.gif name, so numbering does not
+    depend on which clip finishes first. A failing clip only fails itself.
+    Returns the number of GIFs created.
+    """
+    max_workers = max_workers or CONVERSION_WORKERS
+    print(f"⚙️  Converting with up to {max_workers} parallel ffmpeg workers...")
+
+    successful_conversions = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for i, (start, clip_length) in enumerate(clips):
+            output_path = os.path.join(output_dir, f"output_{i+1}.gif")
+            future = pool.submit(convert_single_clip, video_path, output_path, start, clip_length, fps, palette_path)
+            futures[future] = i + 1
+
+        for future in as_completed(futures):
+            clip_number = futures[future]
+            try:
+                ok, error = future.result()
+            except Exception as e:
+                ok, error = False, str(e)
+            if ok:
+                print(f"✅ Saved: output_{clip_number}.gif")
+                successful_conversions += 1
+            else:
+                print(f"⚠️  Failed to create: output_{clip_number}.gif - {error}")
+
+    return successful_conversions
+
+@timed("hash_source")
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_fingerprint(video_path):
+    """
+    Content hash of the source video. Memoized in the probe cache next to the
+    ffprobe metadata, so a file is only hashed again when its size/mtime change.
+    """
+    key = os.path.abspath(video_path)
+    stat = os.stat(video_path)
+    with _probe_cache_lock:
+        entry = load_probe_cache().get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime and "sha256" in entry:
+            return entry["sha256"]
+
+    print("🔑 Hashing source video for the conversion cache...")
+    digest = file_sha256(video_path)
+
+    with _probe_cache_lock:
+        entry = load_probe_cache().get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            entry["sha256"] = digest
+            save_probe_cache()
+    return digest
+
+def logo_settings():
+    """Watermark settings for the cache keys (empty without a logo, so plain keys stay the same)"""
+    logo_path = active_logo_path()
+    if not logo_path:
+        return {}
+    with open(logo_path, "rb") as f:
+        logo_hash = hashlib.sha256(f.read()).hexdigest()
+    return {"logo": [logo_hash, LOGO_WIDTH, LOGO_OPACITY]}
+
+def clip_cache_key(source_hash, start, length, fps, profile):
+    """
+    Cache key of ONE clip: the source content plus every parameter that
+    changes that clip's bytes. Changing e.g. fps only misses the clips it affects.
+    """
+    params = {
+        "source": source_hash,
+        "start": start,
+        "length": length,
+        "fps": fps,
+        "width": GIF_TARGET_WIDTH,
+        "profile": profile,
+    }
+    if profile == "palette":
+        params["palette_fps"] = PALETTE_SAMPLE_FPS
+    params.update(logo_settings())
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+def conversion_settings(clip_length, fps, profile, planning):
+    """Every setting that changes which GIFs end up in a video's folder"""
+    settings = {
+        "clip_length": clip_length,
+        "fps": fps,
+        "width": GIF_TARGET_WIDTH,
+        "profile": profile,
+        "planning": planning,
+    }
+    if profile == "palette":
+        settings["palette_fps"] = PALETTE_SAMPLE_FPS
+    if SKIP_EDGES_SECONDS:
+        settings["skip_edges"] = SKIP_EDGES_SECONDS
+    if planning == "scenes":
+        settings["scenes"] = [SCENE_THRESHOLD, SCENE_MIN_CLIP_LENGTH, SCENE_MAX_BLACK_RATIO, SCENE_MAX_STATIC_RATIO]
+    if DEDUP_ENABLED:
+        settings["dedup"] = [DEDUP_MAX_DISTANCE, DEDUP_SAMPLE_FPS, "frames"]
+    settings.update(logo_settings())
+    return settings
+
+def read_conversion_marker(output_dir):
+    """The CONVERSION_MARKER of a GIF folder, or None"""
+    try:
+        with open(os.path.join(output_dir, CONVERSION_MARKER), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_conversion_marker(output_dir, source_hash, settings, num_gifs, video_path=None):
+    """
+    Record which source and settings produced the GIFs in output_dir. The
+    source path and video ID are provenance for the cleanup tool, which pairs
+    folders with their videos by reading this file instead of guessing from titles.
+    Fresh GIFs start with upload status "pending".
+    """
+    marker = {
+        "source": source_hash,
+        "source_path": os.path.abspath(video_path) if video_path else None,
+        "video_id": extract_video_id(video_path),
+        "settings": settings,
+        "num_gifs": num_gifs,
+        "upload": "pending",
+    }
+    try:
+        with open(os.path.join(output_dir, CONVERSION_MARKER), "w", encoding="utf-8") as f:
+            json.dump(marker, f, indent=1)
+    except OSError as e:
+        print(f"⚠️  Could not write conversion marker: {e}")
+
+def update_upload_status(output_dir, status):
+    """
+    Set the marker's upload status: "pending", "partial" or "complete".
+    Completion time is kept as "uploaded_at" for RetentionManager.
+    """
+    marker = read_conversion_marker(output_dir)
+    if not marker:
+        return
+    marker["upload"] = status
+    if status == "complete":
+        marker.setdefault("uploaded_at", round(time.time(), 3))
+    try:
+        with open(os.path.join(output_dir, CONVERSION_MARKER), "w", encoding="utf-8") as f:
+            json.dump(marker, f, indent=1)
+    except OSError as e:
+        print(f"⚠️  Could not update conversion marker: {e}")
+
+def existing_conversion(video_path, output_dir, clip_length=None, fps=None, profile=None, planning=None):
+    """
+    Number of GIFs in output_dir if they were made from exactly this source
+    file with exactly these settings, else None (folder missing, made from a
+    different video with a similar title, or made with other settings).
+    """
+    marker = read_conversion_marker(output_dir)
+    if not marker:
+        return None
+    settings = conversion_settings(clip_length or CLIP_LENGTH, fps or GIF_FPS,
+                                   profile or ENCODING_PROFILE, planning or CLIP_PLANNING)
+    if marker.get("settings") != settings or marker.get("source") != source_fingerprint(video_path):
+        return None
+    gifs_exist, existing_gif_count = check_existing_gifs(output_dir)
+    if not gifs_exist or existing_gif_count < marker.get("num_gifs", 0):
+        return None
+    # Every uploader walks output_1..N - a folder with gaps (failed clips in an
+    # older run) would lose its last GIFs, so it is converted again
+    if output_gif_numbers(output_dir) != list(range(1, marker["num_gifs"] + 1)):
+        print("⚠️  Existing GIFs are not numbered output_1..N - converting again")
+        return None
+    return marker["num_gifs"]
+
+def folder_owned_by_other_video(output_dir, video_path):
+    """
+    True if output_dir's conversion marker names a different video than
+    video_path (by video ID, else by source path) - its GIFs must not be replaced.
+    """
+    marker = read_conversion_marker(output_dir)
+    if not marker:
+        return False
+    video_id = extract_video_id(video_path)
+    if marker.get("video_id") and video_id:
+        return marker["video_id"] != video_id
+    if marker.get("source_path"):
+        return os.path.normcase(marker["source_path"]) != os.path.normcase(os.path.abspath(video_path))
+    return False
+
+def clear_output_gifs(output_dir):
+    """Remove GIFs of an earlier conversion so stale clips never get uploaded"""
+    for name in os.listdir(output_dir):
+        if re.fullmatch(r"output_\d+\.gif", name):
+            os.remove(os.path.join(output_dir, name))
+    shutil.rmtree(os.path.join(output_dir, "duplicates"), ignore_errors=True)
+
+def output_gif_numbers(output_dir):
+    """Sorted N of every output_N.gif in output_dir"""
+    return sorted(
+        int(name[len("output_"):-len(".gif")])
+        for name in os.listdir(output_dir)
+        if re.fullmatch(r"output_\d+\.gif", name)
+    )
+
+def renumber_output_gifs(output_dir):
+    """
+    Close the gaps failed clips leave in the numbering: rename the GIFs to
+    output_1..output_K in order, since every uploader walks 1..K.
+    Returns K.
+    """
+    numbers = output_gif_numbers(output_dir)
+    for new_number, number in enumerate(numbers, start=1):
+        if number != new_number:
+            # Ascending order: the target slot is always already free
+            os.replace(os.path.join(output_dir, f"output_{number}.gif"),
+                       os.path.join(output_dir, f"output_{new_number}.gif"))
+    return len(numbers)
+
+_link_warned = False
+
+def link_or_copy(source, destination):
+    """Hard-link source to destination (free on the same drive), copy otherwise"""
+    global _link_warned
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError as e:
+        if not _link_warned:
+            _link_warned = True
+            print(f"⚠️  Cannot hard-link {os.path.dirname(source)} -> {os.path.dirname(destination)} ({e}); "
+                  "copying instead - keep CONVERSION_CACHE_DIR on the same drive as GIF_ROOT_DIR")
+        shutil.copy2(source, destination)
+
+def prune_conversion_cache():
+    """
+    Delete the least recently used cache clips (by mtime - hits touch their
+    file) until the cache is under CONVERSION_CACHE_MAX_GB.
+    Returns the number of clips deleted.
+    """
+    if not CONVERSION_CACHE_MAX_GB:
+        return 0
+    entries = []
+    try:
+        with os.scandir(CONVERSION_CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".gif"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return 0
+
+    budget = int(CONVERSION_CACHE_MAX_GB * 1024 ** 3)
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        print(f"🧹 Conversion cache: removed {removed} least recently used clips")
+    return removed
+
+def video_to_gifs(video_path, output_dir, clip_length=None, fps=None, mode=None, max_workers=None, profile=None, planning=None):
+    """
+    Converts a video file to multiple GIF clips.
+    mode: "single_pass" (decode once for many clips), "parallel" (bounded pool of
+    per-clip ffmpeg processes) or "per_clip" (one ffmpeg per clip, one at a time).
+    profile: "palette" (one palette per video, reused for every clip) or "plain".
+    planning: "scenes" (cut on shot changes, drop black/static clips) or "fixed"
+    (every clip_length seconds).
+    Defaults to CLIP_LENGTH / GIF_FPS / CONVERSION_MODE / ENCODING_PROFILE /
+    CLIP_PLANNING; max_workers defaults to CONVERSION_WORKERS. The first and
+    last SKIP_EDGES_SECONDS of the video are never converted.
+    Clips already in the conversion cache are linked in instead of re-encoded.
+    Returns the number of GIFs created, always numbered output_1..output_N.
+    """
+    clip_length = clip_length or CLIP_LENGTH
+    fps = fps or GIF_FPS
+    mode = mode or CONVERSION_MODE
+    profile = profile or ENCODING_PROFILE
+    planning = planning or CLIP_PLANNING
+    if ENCODER == "logo" and not active_logo_path():
+        print(f"⚠️  Logo file not found: {LOGO_PATH} - converting without watermark")
+
+    # Ensure output folder exists with robust creation
+    if not robust_directory_creation(output_dir):
+        return 0
+    if folder_owned_by_other_video(output_dir, video_path):
+        print(f"❌ {output_dir} holds the GIFs of another video - not overwriting them")
+        return 0
+
+    # Get video duration (and stream metadata) from the probe cache / ffprobe
+    try:
+        video_info = probe_video(video_path)
+        duration = video_info["duration"]
+    except (OSError, TypeError, ValueError, subprocess.SubprocessError) as e:
+        print(f"❌ Could not read video duration: {e}")
+        return 0
+
+    print(f"⏱ Video length: {duration:.2f} seconds")
+    print(f"🎞 Source: {video_info['width']}x{video_info['height']} @ {video_info['fps']:.2f} fps ({video_info['codec']})")
+
+    # Leave the intro and outro out
+    skip = SKIP_EDGES_SECONDS
+    if skip:
+        if duration - 2 * skip <= 0:
+            print(f"❌ Video is too short after skipping the first and last {skip} seconds")
+            return 0
+        print(f"🎯 Usable duration (after skipping first/last {skip}s): {duration - 2 * skip:.2f} seconds")
+
+    # Decide where the clips go
+    clips = []
+    if planning == "scenes":
+        analysis = get_scene_analysis(video_path, duration)
+        if analysis:
+            clips = plan_scene_clips(duration, analysis, clip_length, skip)
+        if not clips:
+            print("⚠️  Scene planning produced no clips - using fixed slicing")
+    if not clips:
+        clips = plan_fixed_clips(duration, clip_length, skip)
+
+    # Number of GIFs to create
+    num_clips = len(clips)
+    print(f"🔄 Creating {num_clips} GIF clips of up to {clip_length} seconds each ({mode})...")
+
+    clear_output_gifs(output_dir)
+
+    # Link in every clip the conversion cache already has
+    source_hash = source_fingerprint(video_path)
+    cache_paths = {}
+    todo = []
+    for number, (start, length) in enumerate(clips, start=1):
+        if CONVERSION_CACHE_ENABLED:
+            cache_path = os.path.join(CONVERSION_CACHE_DIR, clip_cache_key(source_hash, start, length, fps, profile) + ".gif")
+            if os.path.exists(cache_path):
+                link_or_copy(cache_path, os.path.join(output_dir, f"output_{number}.gif"))
+                try:
+                    os.utime(cache_path)  # Recently used - pruned last
+                except OSError:
+                    pass
+                continue
+            cache_paths[number] = cache_path
+        todo.append((number, (start, length)))
+
+    cached = num_clips - len(todo)
+    if cached:
+        print(f"⚡ {cached}/{num_clips} clips reused from the conversion cache")
+
+    successful_conversions = cached
+    if todo:
+        # With cache hits in between, encode the missing clips in a staging
+        # folder (numbered 1..k) and move each into its real output_N.gif slot
+        work_dir = output_dir if not cached else os.path.join(output_dir, ".converting")
+        os.makedirs(work_dir, exist_ok=True)
+        todo_clips = [clip for _, clip in todo]
+
+        # Palette is computed ONCE per video and shared by every clip
+        palette_path = None
+        if profile == "palette":
+            palette_path = generate_palette(video_path, output_dir)
+            if not palette_path:
+                print("⚠️  Falling back to ffmpeg's default GIF palette")
+
+        if mode == "single_pass":
+            convert_clips_single_pass(video_path, work_dir, todo_clips, fps, palette_path)
+        elif mode == "parallel":
+            convert_clips_parallel(video_path, work_dir, todo_clips, fps, palette_path, max_workers)
+        else:
+            convert_clips_per_clip(video_path, work_dir, todo_clips, fps, palette_path)
+
+        if CONVERSION_CACHE_ENABLED:
+            os.makedirs(CONVERSION_CACHE_DIR, exist_ok=True)
+        for staged_number, (number, _) in enumerate(todo, start=1):
+            staged_path = os.path.join(work_dir, f"output_{staged_number}.gif")
+            if not os.path.exists(staged_path):
+                continue
+            # Only a palette-mapped (and, with a logo, watermarked) clip matches its cache key
+            if without_logo(staged_path):
+                print(f"⚠️  output_{number}.gif has no watermark - not caching it")
+            elif number in cache_paths and (palette_path or profile != "palette"):
+                link_or_copy(staged_path, cache_paths[number])
+            if work_dir != output_dir:
+                os.replace(staged_path, os.path.join(output_dir, f"output_{number}.gif"))
+            successful_conversions += 1
+        if work_dir != output_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if CONVERSION_CACHE_ENABLED:
+            prune_conversion_cache()
+    
+    print(f"📊 Successfully created {successful_conversions}/{num_clips} GIFs")
+    if successful_conversions < num_clips:
+        successful_conversions = renumber_output_gifs(output_dir)
+
+    if DEDUP_ENABLED and successful_conversions > 1:
+        successful_conversions = remove_duplicate_gifs(output_dir, extract_video_id(video_path))
+
+    write_conversion_marker(output_dir, source_hash,
+                            conversion_settings(clip_length, fps, profile, planning), successful_conversions,
+                            video_path=video_path)
+    return successful_conversions
+
+def load_hash_index():
+    """Load the persisted perceptual hash index (once per run)"""
+    global _hash_index
+    if _hash_index is None:
+        try:
+            with open(HASH_INDEX_PATH, "r", encoding="utf-8") as f:
+                _hash_index = json.load(f)
+        except (OSError, ValueError):
+            _hash_index = {"entries": []}
+    return _hash_index
+
+def save_hash_index():
+    """Write the perceptual hash index back to disk"""
+    try:
+        os.makedirs(os.path.dirname(HASH_INDEX_PATH), exist_ok=True)
+        tmp_path = HASH_INDEX_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_hash_index, f)
+        os.replace(tmp_path, HASH_INDEX_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not save hash index: {e}")
+
+def sample_gif_frames(gif_path):
+    """Raw 9x8 grayscale frames sampled from a GIF (DEDUP_SAMPLE_FPS per second)"""
+    command = [
+        "ffmpeg", "-v", "error", "-i", gif_path,
+        "-vf", f"fps={DEDUP_SAMPLE_FPS},scale=9:8,format=gray",
+        "-f", "rawvideo", "-"
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise subprocess.SubprocessError(result.stderr.decode(errors="replace")[-200:])
+    return result.stdout
+
+def perceptual_hashes(gif_paths):
+    """
+    64-bit difference hash of every sampled frame: each pixel is compared
+    with its right-hand neighbour. The comparisons run vectorized over the
+    frames of every GIF at once.
+    Returns {gif_path: uint64 array, one hash per frame}; GIFs that cannot be
+    read are left out.
+    """
+    import numpy as np
+
+    frame_sets = []
+    hashed_paths = []
+    for gif_path in gif_paths:
+        try:
+            raw = sample_gif_frames(gif_path)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️  Could not hash {os.path.basename(gif_path)}: {e}")
+            continue
+        frames = np.frombuffer(raw, dtype=np.uint8)
+        frames = frames[:frames.size - frames.size % 72].reshape(-1, 8, 9)
+        if len(frames):
+            frame_sets.append(frames)
+            hashed_paths.append(gif_path)
+
+    if not frame_sets:
+        return {}
+    stack = np.concatenate(frame_sets)                   # (frames, 8, 9)
+    bits = stack[:, :, 1:] > stack[:, :, :-1]            # (frames, 8, 8)
+    packed = np.packbits(bits.reshape(len(stack), 64), axis=1)
+    values = packed.view(">u8").ravel().astype(np.uint64)
+    per_gif = np.split(values, np.cumsum([len(frames) for frames in frame_sets])[:-1])
+    return dict(zip(hashed_paths, per_gif))
+
+def is_duplicate_sequence(hashes, other):
+    """
+    True if two frame hash sequences match frame by frame: same number of
+    sampled frames (give or take one) and every aligned pair of frames within
+    DEDUP_MAX_DISTANCE bits. Clips sharing a background but not the action
+    differ in some frames, so they are not duplicates.
+    """
+    import numpy as np
+
+    if not len(hashes) or abs(len(hashes) - len(other)) > 1:
+        return False
+    count = min(len(hashes), len(other))
+    diff = np.bitwise_xor(hashes[:count], other[:count])
+    distances = np.unpackbits(diff.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+    return int(distances.max()) <= DEDUP_MAX_DISTANCE
+
+@timed("dedup")
+def remove_duplicate_gifs(output_dir, video_id=None):
+    """
+    Drop near-duplicate GIFs before upload. Each output_N.gif is hashed frame by frame and
+    compared against the GIFs already kept from this video and against the
+    persisted index of earlier videos; duplicates are moved to a duplicates
+    sub-folder and the survivors are renumbered output_1..output_K so the
+    uploaders see a contiguous run. Kept hashes are added to the index.
+    Returns the number of GIFs left to upload.
+    """
+    gif_paths = [os.path.join(output_dir, f"output_{number}.gif") for number in output_gif_numbers(output_dir)]
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️  numpy is not installed - skipping near-duplicate check")
+        return len(gif_paths)
+
+    print(f"🧬 Checking {len(gif_paths)} GIFs for near-duplicates...")
+    hashes = perceptual_hashes(gif_paths)
+    owner = video_id or os.path.basename(output_dir)
+
+    with _hash_index_lock:
+        index = load_hash_index()
+        # Re-running a video replaces its own entries instead of matching them;
+        # entries without per-frame "hashes" (one averaged hash) cannot be compared
+        index["entries"] = [entry for entry in index["entries"]
+                            if entry["video_id"] != owner and "hashes" in entry]
+        history = [(np.array([int(value, 16) for value in entry["hashes"]], dtype=np.uint64), entry["video_id"])
+                   for entry in index["entries"]]
+
+        kept_paths = []
+        kept_hashes = []
+        duplicates = []
+        for gif_path in gif_paths:
+            frames = hashes.get(gif_path)
+            if frames is None:
+                kept_paths.append(gif_path)
+                continue
+
+            match = None
+            if any(is_duplicate_sequence(frames, other) for other in kept_hashes):
+                match = "this video"
+            if match is None:
+                match = next((video for other, video in history if is_duplicate_sequence(frames, other)), None)
+
+            if match:
+                duplicates.append((gif_path, match))
+            else:
+                kept_paths.append(gif_path)
+                kept_hashes.append(frames)
+
+        if duplicates:
+            duplicates_dir = os.path.join(output_dir, "duplicates")
+            os.makedirs(duplicates_dir, exist_ok=True)
+            for gif_path, match in duplicates:
+                name = os.path.basename(gif_path)
+                os.replace(gif_path, os.path.join(duplicates_dir, name))
+                print(f"♻️  {name} duplicates a GIF from {match} - skipped")
+
+            # Renumber the survivors so output_1..output_K stay contiguous
+            for new_number, gif_path in enumerate(kept_paths, start=1):
+                new_path = os.path.join(output_dir, f"output_{new_number}.gif")
+                if gif_path != new_path:
+                    os.replace(gif_path, new_path)
+                if gif_path in hashes:
+                    hashes[new_path] = hashes.pop(gif_path)
+                kept_paths[new_number - 1] = new_path
+
+        for gif_path in kept_paths:
+            if gif_path in hashes:
+                index["entries"].append({
+                    "hashes": [f"{int(value):016x}" for value in hashes[gif_path]],
+                    "video_id": owner,
+                    "file": os.path.basename(gif_path),
+                })
+        save_hash_index()
+
+    print(f"✅ Kept {len(kept_paths)} GIFs, skipped {len(duplicates)} near-duplicates")
+    return len(kept_paths)
+
+def extract_video_id(video_path):
+    """Pull the "[id]" part out of a downloaded file name (None if absent)"""
+    if not video_path:
+        return None
+    match = re.search(r'\[([^\[\]]+)\]\.[^.]+$', os.path.basename(video_path))
+    return match.group(1) if match else None
+
+def tag_cache_key(video_id, model_name, prompt):
+    """Cache key: video ID plus a hash of the model and the exact prompt"""
+    prompt_hash = hashlib.sha1(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()[:16]
+    return f"{video_id or 'no-id'}:{prompt_hash}"
+
+def load_tag_cache():
+    """Load the tag cache, dropping entries older than TAG_CACHE_TTL_DAYS"""
+    try:
+        with open(TAG_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    oldest_allowed = time.time() - TAG_CACHE_TTL_DAYS * 86400
+    return {key: entry for key, entry in cache.items() if entry.get("created", 0) >= oldest_allowed}
+
+def save_tag_cache(cache):
+    """Write the tag cache, keeping only the TAG_CACHE_MAX_ENTRIES most recently used entries"""
+    if len(cache) > TAG_CACHE_MAX_ENTRIES:
+        newest = sorted(cache.items(), key=lambda item: item[1].get("last_used", 0), reverse=True)
+        cache = dict(newest[:TAG_CACHE_MAX_ENTRIES])
+    try:
+        os.makedirs(os.path.dirname(TAG_CACHE_PATH), exist_ok=True)
+        temp_path = TAG_CACHE_PATH + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(temp_path, TAG_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not save tag cache: {e}")
+
+def get_cached_tags(key):
+    """Return cached tags for key (refreshing its LRU timestamp) or None"""
+    with _tag_cache_lock:
+        cache = load_tag_cache()
+        entry = cache.get(key)
+        if not entry:
+            return None
+        entry["last_used"] = time.time()
+        save_tag_cache(cache)
+        return list(entry["tags"])
+
+def store_cached_tags(key, tags):
+    """Remember generated tags for key"""
+    with _tag_cache_lock:
+        cache = load_tag_cache()
+        now = time.time()
+        cache[key] = {"tags": list(tags), "created": now, "last_used": now}
+        save_tag_cache(cache)
+
+@timed("tags")
+def setup_gemini(video_title, video_description, video_tags, video_id=None):
+    """
+    Configure the Gemini AI for tag generation using gemini-2.0-flash-exp based on YouTube video content.
+    Tags are cached on disk per video ID + prompt/model, so re-runs skip the API call.
+    Returns the tag list (fallback tags if the API call fails).
+    """
+    import google.generativeai as genai
+    try:
+        # Use the specified model
+        model_name = "gemini-2.0-flash-exp"
+        
+        # Prepare context from YouTube video
+        context = f"Video Title: {video_title}"
+        if video_description:
+            # Limit description length to avoid token limits
+            short_description = video_description[:500] + "..." if len(video_description) > 500 else video_description
+            context += f"\nVideo Description: {short_description}"
+        if video_tags:
+            context += f"\nVideo Tags: {', '.join(video_tags[:10])}"  # Limit to first 10 tags
+        
+        prompt = f"""
+        Based on this YouTube video content:
+        {context}
+        
+        Generate 14 short, SEO-friendly hashtags specifically relevant to this video's content. 
+        Focus on tags that would be appropriate for GIF clips from this video.
+        Include a mix of:
+        - Specific tags related to the video content
+        - Trending/viral tags
+        - Entertainment/comedy tags
+        - Popular culture tags
+        
+        Only output the tags separated by commas, no other text.
+        """
+        
+        # Re-use tags generated for this exact video + prompt on an earlier run
+        cache_key = tag_cache_key(video_id, model_name, prompt)
+        cached_tags = get_cached_tags(cache_key)
+        if cached_tags:
+            tags = cached_tags
+            print("⚡ Using cached tags:", tags)
+            return tags
+        
+        genai.configure(api_key="YOUR API ")
+        print(f"✅ Using model: {model_name}")
+        model = genai.GenerativeModel(model_name=model_name)
+        
+        # Generate tags based on YouTube video content
+        print("🤖 Generating tags with Gemini AI based on YouTube video content...")
+        with TIMER.span("llm_request", model=model_name):
+            response = model.generate_content(prompt)
+        text_response = response.text.strip()
+        tags = [tag.strip() for tag in text_response.replace("\n", "").split(",") if tag.strip()]
+        
+        # Ensure we have exactly 14 tags
+        if len(tags) < 14:
+            print(f"⚠️  Generated only {len(tags)} tags, adding some defaults...")
+            default_tags = ["#gif", "#animation", "#funny", "#meme", "#trending", "#viral", "#entertainment", "#comedy", "#dance", "#viralvideo", "#fun", "#lol", "#popular", "#fyp"]
+            # Add defaults without duplicates
+            for tag in default_tags:
+                if tag not in tags and len(tags) < 14:
+                    tags.append(tag)
+        else:
+            tags = tags[:14]
+            
+        print("✅ Tags generated based on YouTube content:", tags)
+        store_cached_tags(cache_key, tags)
+        return tags
+        
+    except Exception as e:
+        print(f"❌ Gemini AI setup failed: {e}")
+        # Fallback to video-based tags or defaults
+        if video_tags:
+            tags = [f"#{tag.replace(' ', '')}" for tag in video_tags[:14]]
+            if len(tags) < 14:
+                tags.extend(["#gif", "#animation", "#funny", "#meme", "#trending", "#viral"])
+                tags = tags[:14]
+        else:
+            tags = ["#gif", "#animation", "#funny", "#meme", "#trending", "#viral", "#entertainment", "#comedy", "#dance", "#viralvideo", "#fun", "#lol", "#popular", "#fyp"]
+        print("✅ Using fallback tags:", tags)
+        return tags
+
+def build_cerebras_prompt(video_title, video_description, video_tags):
+    """Build the per-video Cerebras tag prompt (also used as part of the tag cache key)"""
+    # Prepare context from YouTube video
+    context = f"Video Title: {video_title}"
+    if video_description:
+        # Limit description length to avoid token limits
+        short_description = video_description[:500] + "..." if len(video_description) > 500 else video_description
+        context += f"\nVideo Description: {short_description}"
+    if video_tags:
+        context += f"\nVideo Tags: {', '.join(video_tags[:10])}"  # Limit to first 10 tags
+
+    prompt = f"""
+    Based on this YouTube video content:
+    {context}
+
+    Generate 14 short, SEO-friendly hashtags specifically relevant to this video's content. 
+    Focus on tags that would be appropriate for GIF clips from this video. Ensure it has movie name as first, then the heroine, then the hero, and then follow the most popular part of that movie.
+
+    IMPORTANT FORMATTING RULES:
+    1. Output ONLY the 14 tags separated by commas
+    2. Each tag should be a single hashtag (e.g., #MovieName, #ActressName, #ActorName)
+    3. Do not combine multiple tags into one string
+    4. No additional text, explanations, or formatting
+    5. Example format: #RRR, #AliaBhatt, #RamCharan, #NaatuNaatu, #Dance, #Trending, #Viral, #TeluguMovie, #Blockbuster, #Oscar, #Music, #Action, #Epic, #IndianCinema
+
+    Generate exactly 14 tags in this format.
+    """
+    return prompt
+
+def finalize_tags(tags_list):
+    """
+    Clean and validate raw AI tags into the final upload list: exactly 14
+    unique hashtags, followed by UNIVERSAL_TAG when one is set.
+    """
+    validated_tags = []
+    for tag in tags_list:
+        # Remove any trailing punctuation
+        tag = tag.rstrip('.,;:!?')
+
+        # Ensure it starts with #
+        if not tag.startswith('#'):
+            tag = '#' + tag
+
+        # Remove any internal problematic characters
+        tag = tag.replace(' ', '').replace('-', '').replace('_', '')
+
+        # Limit tag length
+        if len(tag) > 30:
+            tag = tag[:30]
+
+        # Add to validated list if not a duplicate
+        if tag and tag not in validated_tags:
+            validated_tags.append(tag)
+
+    print(f"📊 Generated {len(validated_tags)} unique tags after validation")
+
+    if len(validated_tags) < 14:
+        print(f"⚠️  Generated only {len(validated_tags)} tags, adding some defaults...")
+        default_tags = [
+            "#gif", "#animation", "#funny", "#meme", "#trending", 
+            "#viral", "#entertainment", "#comedy", "#dance", 
+            "#viralvideo", "#fun", "#lol", "#popular", "#fyp"
+        ]
+        # Add defaults without duplicates
+        for tag in default_tags:
+            if tag not in validated_tags and len(validated_tags) < 14:
+                validated_tags.append(tag)
+
+    # Take only first 14 tags
+    validated_tags = validated_tags[:14]
+
+    # The universal tag always goes last (and only once)
+    if UNIVERSAL_TAG:
+        if UNIVERSAL_TAG in validated_tags:
+            validated_tags.remove(UNIVERSAL_TAG)
+        validated_tags.append(UNIVERSAL_TAG)
+    return validated_tags
+
+def cerebras_cache_key(video_id, prompt):
+    """Tag cache key shared by setup_cerebras and generate_tags_batch"""
+    # (the universal tag is part of the key so changing it regenerates)
+    return tag_cache_key(video_id, f"{TAG_MODEL_NAME}|{UNIVERSAL_TAG}", prompt)
+
+def cerebras_completion(prompt, max_completion_tokens):
+    """Send one prompt to the Cerebras chat API and return the reply text"""
+    from cerebras.cloud.sdk import Cerebras
+
+    client = Cerebras(api_key=CEREBRAS_API_KEY)
+    with TIMER.span("llm_request", model=TAG_MODEL_NAME):
+        completion = client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=TAG_MODEL_NAME,
+            max_completion_tokens=max_completion_tokens,
+            temperature=0.2,
+            top_p=1,
+            stream=False
+        )
+    return completion.choices[0].message.content.strip()
+
+def parse_batch_response(text_response, count):
+    """
+    Parse a batched tag response into {number: [raw tags]}.
+    Expects a JSON object like {"1": ["#a", ...], "2": [...]} but also accepts
+    one "1: #a, #b, ..." line per video if the model ignores the JSON format.
+    """
+    results = {}
+    start = text_response.find('{')
+    end = text_response.rfind('}')
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text_response[start:end + 1])
+            for key, value in data.items():
+                number = int(re.sub(r'\D', '', str(key)) or 0)
+                if isinstance(value, str):
+                    value = value.split(',')
+                results[number] = [str(tag).strip() for tag in value if str(tag).strip()]
+        except (ValueError, AttributeError):
+            results = {}
+
+    if not results:
+        for line in text_response.splitlines():
+            match = re.match(r'\s*(?:Video\s*)?(\d+)\s*[:.)-]\s*(.+)', line)
+            if match:
+                results[int(match.group(1))] = [tag.strip() for tag in match.group(2).split(',') if tag.strip()]
+
+    return {number: tags for number, tags in results.items() if 1 <= number <= count}
+
+def generate_tags_batch(videos):
+    """
+    Generate Cerebras tags for MANY videos with ONE request.
+    videos: list of dicts with video_id, title, description and tags.
+    Each result goes through finalize_tags and into the tag cache under the
+    same key setup_cerebras uses, so the upload step later finds it without
+    another API call. Returns {video_id: final_tags} for the videos tagged.
+    """
+    # Skip videos that already have cached tags
+    pending = []
+    for video in videos:
+        prompt = build_cerebras_prompt(video["title"], video["description"], video["tags"])
+        key = cerebras_cache_key(video["video_id"], prompt)
+        if get_cached_tags(key) is None:
+            pending.append((video, key, prompt))
+
+    if not pending:
+        return {}
+
+    sections = []
+    for number, (video, key, prompt) in enumerate(pending, 1):
+        sections.append(f"VIDEO {number}:\n{prompt.strip()}")
+
+    batch_prompt = (
+        f"You will tag {len(pending)} YouTube videos. Follow the instructions given for EACH video.\n\n"
+        + "\n\n".join(sections)
+        + "\n\nReturn ONLY a JSON object mapping the video number to its list of 14 hashtags, e.g. "
+        + '{"1": ["#Tag1", "#Tag2"], "2": ["#Tag1", "#Tag2"]}. No other text.'
+    )
+
+    print(f"🤖 Generating tags for {len(pending)} videos in ONE Cerebras request...")
+    parsed = parse_batch_response(cerebras_completion(batch_prompt, 256 * len(pending) + 256), len(pending))
+
+    results = {}
+    for number, (video, key, prompt) in enumerate(pending, 1):
+        if number not in parsed:
+            print(f"⚠️  No tags returned for video {number} ({video['title']}) - it will be tagged on its own later")
+            continue
+        final_tags = finalize_tags(parsed[number])
+        store_cached_tags(key, final_tags)
+        results[video["video_id"]] = final_tags
+
+    print(f"✅ Batched tags ready for {len(results)}/{len(pending)} videos")
+    return results
+
+def fetch_video_metadata(url):
+    """Title, description, keywords and ID for a URL WITHOUT downloading the video"""
+    if DOWNLOADER == "pytubefix":
+        from pytubefix import YouTube
+        yt = YouTube(url)
+        return {
+            "video_id": yt.video_id,
+            "title": yt.title,
+            "description": yt.description,
+            "tags": yt.keywords if hasattr(yt, 'keywords') else [],
+        }
+    import yt_dlp
+    with yt_dlp.YoutubeDL({"quiet": True, "skip_download": True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return {
+        "video_id": info.get("id"),
+        "title": info.get("title", "Unknown_Title"),
+        "description": info.get("description", ""),
+        "tags": info.get("tags", []),
+    }
+
+def prefetch_tags_in_background(urls):
+    """
+    Start a daemon thread that reads the metadata of every URL and generates
+    their Cerebras tags in batches of TAG_BATCH_SIZE while the first videos
+    are still downloading and converting. setup_cerebras then hits the tag cache.
+    """
+    def worker():
+        batch = []
+        for url in urls:
+            try:
+                batch.append(fetch_video_metadata(url))
+            except Exception as e:
+                print(f"⚠️  Could not read metadata for {url}: {e}")
+            if len(batch) >= TAG_BATCH_SIZE:
+                try:
+                    generate_tags_batch(batch)
+                except Exception as e:
+                    print(f"⚠️  Batched tag generation failed: {e}")
+                batch = []
+        if batch:
+            try:
+                generate_tags_batch(batch)
+            except Exception as e:
+                print(f"⚠️  Batched tag generation failed: {e}")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+@timed("tags")
+def setup_cerebras(video_title, video_description, video_tags, video_id=None):
+    """
+    TAGGER "cerebras": generate tags with TAG_MODEL_NAME on Cerebras based on
+    the YouTube video content. Tags are cached on disk per video ID +
+    prompt/model, so re-runs (and prefetched batches) skip the API call.
+    Returns the tag list (fallback tags if the API call fails).
+    """
+    try:
+        prompt = build_cerebras_prompt(video_title, video_description, video_tags)
+        
+        # Re-use tags generated for this exact video + prompt earlier
+        # (by a previous run or by the background batch request)
+        cache_key = cerebras_cache_key(video_id, prompt)
+        cached_tags = get_cached_tags(cache_key)
+        if cached_tags:
+            tags = cached_tags
+            print(f"⚡ Using cached tags ({len(tags)} total): {', '.join(tags)}")
+            return tags
+        
+        print("🤖 Generating tags with Cerebras AI based on YouTube video content...")
+        text_response = cerebras_completion(prompt, 1024)
+        print(f"🔍 RAW AI RESPONSE: '{text_response}'")
+        
+        # Remove common prefixes that might cause issues
+        cleaned_response = text_response.strip()
+        prefixes_to_remove = ["Here are the tags:", "Tags:", "Generated tags:", "The tags are:"]
+        for prefix in prefixes_to_remove:
+            if cleaned_response.startswith(prefix):
+                cleaned_response = cleaned_response[len(prefix):].strip()
+        
+        # Split by comma first, then hashtags separated by spaces, then any #word
+        tags_list = []
+        if ',' in cleaned_response:
+            tags_list = [tag.strip() for tag in cleaned_response.split(',') if tag.strip()]
+        if len(tags_list) < 5 and ' ' in cleaned_response:
+            spaced = [tag.strip() for tag in cleaned_response.split() if tag.strip().startswith('#')]
+            if len(spaced) > len(tags_list):
+                tags_list = spaced
+        if len(tags_list) < 3:
+            tags_list = re.findall(r'#\w+', cleaned_response) or tags_list
+        
+        tags = finalize_tags(tags_list)
+        print(f"✅ FINAL tags ({len(tags)} total): {', '.join(tags)}")
+        store_cached_tags(cache_key, tags)
+        return tags
+        
+    except Exception as e:
+        print(f"❌ Cerebras AI setup failed: {e}")
+        # Fallback to video-based tags or defaults
+        if video_tags:
+            tags = [f"#{tag.replace(' ', '')}" for tag in video_tags[:14]]
+            if len(tags) < 14:
+                tags.extend(["#gif", "#animation", "#funny", "#meme", "#trending", "#viral"])
+                tags = tags[:14]
+        else:
+            tags = [
+                "#gif", "#animation", "#funny", "#meme", "#trending", 
+                "#viral", "#entertainment", "#comedy", "#dance", 
+                "#viralvideo", "#fun", "#lol", "#popular", "#fyp"
+            ]
+        if UNIVERSAL_TAG:
+            if UNIVERSAL_TAG in tags:
+                tags.remove(UNIVERSAL_TAG)
+            tags.append(UNIVERSAL_TAG)
+        print("✅ Using fallback tags:", ", ".join(tags))
+        return tags
+
+TAGGERS = {
+    "gemini": setup_gemini,
+    "cerebras": setup_cerebras,
+}
+
+# Errors of a wait_until check that will never go away by waiting
+WAIT_FATAL_ERRORS = (ImportError, NameError, AttributeError, TypeError)
+
+def wait_until(condition, timeout, description, poll_interval=WAIT_POLL_INTERVAL):
+    """
+    Poll condition() until it returns True or timeout seconds pass.
+    Returns True as soon as the condition is met, False on timeout
+    (callers carry on, exactly like the old fixed sleeps did).
+    A check that fails at runtime (window gone, screenshot error...) counts as
+    "not yet" and is reported once; a missing module or a programming error
+    (WAIT_FATAL_ERRORS) is raised instead of being waited out.
+    """
+    started = time.time()
+    deadline = started + timeout
+    reported = False
+    with TIMER.span("wait", description=description, timeout=timeout):
+        while True:
+            try:
+                if condition():
+                    print(f"⚡ {description} after {time.time() - started:.1f}s")
+                    return True
+            except WAIT_FATAL_ERRORS:
+                raise
+            except Exception as e:
+                if not reported:
+                    reported = True
+                    print(f"⚠️  Check for \"{description}\" failed ({type(e).__name__}: {e}) - retrying")
+            if time.time() >= deadline:
+                print(f"⚠️  Timed out after {timeout}s waiting for: {description}")
+                return False
+            time.sleep(poll_interval)
+
+def window_exists(title):
+    """True if a top-level window with this exact title is open"""
+    from pywinauto import Desktop
+    return Desktop(backend="win32").window(title=title).exists(timeout=0)
+
+def wait_for_window(title, timeout=10):
+    """Wait for a window (e.g. the "Open" dialog) to appear"""
+    return wait_until(lambda: window_exists(title), timeout, f'"{title}" window open')
+
+def wait_for_window_closed(title, timeout=10):
+    """Wait for a window (e.g. the "Open" dialog) to close"""
+    return wait_until(lambda: not window_exists(title), timeout, f'"{title}" window closed')
+
+def region_signature(region):
+    """Cheap fingerprint of a screen region (left, top, width, height)"""
+    import pyautogui
+    image = pyautogui.screenshot(region=region)
+    return hashlib.md5(image.tobytes()).hexdigest()
+
+def wait_for_region_change(region, timeout, description, baseline=None):
+    """Wait until the pixels in region differ from baseline (taken now if not given)"""
+    if baseline is None:
+        baseline = region_signature(region)
+    return wait_until(lambda: region_signature(region) != baseline, timeout, description)
+
+def wait_for_region_stable(region, timeout, description, settle=1.0):
+    """
+    Wait until region stops changing for settle seconds - used as
+    "page finished loading/rendering" without a fixed sleep.
+    """
+    state = {"signature": None, "since": time.time()}
+
+    def is_stable():
+        signature = region_signature(region)
+        now = time.time()
+        if signature != state["signature"]:
+            state["signature"] = signature
+            state["since"] = now
+            return False
+        return now - state["since"] >= settle
+
+    return wait_until(is_stable, timeout, description)
+
+def copy_to_clipboard(text, timeout=2):
+    """Copy text and wait (briefly, silently) until the clipboard really holds it"""
+    import pyperclip
+    pyperclip.copy(text)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if pyperclip.paste() == text:
+                return True
+        except Exception:
+            pass
+        time.sleep(0.05)
+    return False
+
+@timed("navigate")
+def navigate_to_tenor():
+    """Navigate to Tenor upload page (in BROWSER) and click the specified buttons"""
+    import pyautogui
+    print(f"🌐 Opening Tenor GIF Maker in {BROWSER.title()}...")
+    url = "https://tenor.com/gif-maker?utm_source=nav-bar&utm_medium=internal&utm_campaign=gif-maker-entrypoints"
+
+    if BROWSER == "chrome":
+        # Open in Chrome using new tab
+        try:
+            chrome_path = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+            if os.path.exists(chrome_path):
+                subprocess.Popen([chrome_path, "--new-tab", url])
+            else:
+                # Fallback: use webbrowser with Chrome
+                webbrowser.get('chrome').open_new_tab(url)
+        except Exception:
+            # Final fallback: use default browser
+            webbrowser.open_new_tab(url)
+    elif platform.system() == "Windows":
+        subprocess.Popen(f'start opera "{url}"', shell=True)
+    elif platform.system() == "Darwin":  # macOS
+        subprocess.Popen(['open', '-a', 'Opera', url])
+    else:  # Linux
+        subprocess.Popen(['opera', url])
+    
+    # Wait for browser to open and the page to stop rendering
+    print(f"⏳ Waiting for {BROWSER.title()} to load...")
+    wait_for_region_stable(TENOR_PAGE_REGION, PAGE_LOAD_TIMEOUT, "Tenor page loaded")
+    
+    # Ensure the browser window is active
+    pyautogui.click(960, 540)  # Click center of screen to focus the browser
+    pause(UI_SETTLE_DELAY, "ui settle")
+    
+    # FIRST CLICK: Click at (1303, 672)
+    print("🖱 FIRST CLICK at (1303, 672)...")
+    baseline = region_signature(TENOR_PAGE_REGION)
+    pyautogui.click(1303, 672)
+    
+    # Wait for the page to react to the click
+    print("⏳ Waiting for page to react...")
+    wait_for_region_change(TENOR_PAGE_REGION, 5, "page reacted to first click", baseline)
+    wait_for_region_stable(TENOR_PAGE_REGION, 5, "page settled", settle=0.5)
+    
+    # SECOND CLICK: Click at (1846, 968)
+    print("🖱 SECOND CLICK at (1846, 968)...")
+    pyautogui.click(1846, 968)
+    wait_for_region_stable(TENOR_PAGE_REGION, 5, "page settled", settle=0.5)
+
+@timed("click_upload_area")
+def click_upload_area():
+    """Click on the upload area coordinates"""
+    import pyautogui
+    print("🖱 Clicking upload area...")
+    pyautogui.click(1312, 700)
+    wait_for_window("Open", timeout=10)
+
+@timed("open_files")
+def open_files_batch_new(start, end, output_dir, navigate=True):
+    """
+    Open files from start to end index - navigate to GIF directory (navigate=True,
+    until a batch has been opened from it) and select files
+    """
+    import pyautogui
+    print(f"📁 Opening files: output_{start}.gif to output_{end}.gif")
+    
+    try:
+        from pywinauto.application import Application
+        
+        # Ensure we're in Opera window
+        pyautogui.click(960, 540)  # Click to focus Opera
+        pause(UI_SETTLE_DELAY, "ui settle")
+        
+        app = Application().connect(title="Open", timeout=10)
+        dlg = app.window(title="Open")
+        
+        # Navigate to the directory until the dialog has opened a batch from it
+        if navigate:
+            # Type the full output directory path directly
+            print(f"📂 Navigating to GIF directory: {output_dir}")
+            
+            # Clear any existing text and type the directory path
+            dlg["Edit"].set_text("")
+            
+            # MORE ROBUST PATH HANDLING - Use clipboard for complex paths
+            copy_to_clipboard(output_dir)
+            dlg["Edit"].type_keys("^v")  # Ctrl+V to paste
+            wait_until(lambda: dlg["Edit"].window_text() == output_dir, 3, "directory path entered")
+            pyautogui.press('enter')
+            
+            # Explorer clears the file name box once it has switched folders
+            print("⏳ Waiting for the dialog to open the directory...")
+            wait_until(lambda: dlg["Edit"].window_text() == "", 5, "dialog switched to GIF directory")
+        else:
+            # A batch was opened from the directory, so the dialog is still there
+            print("📂 Already in directory, selecting files directly...")
+        
+        # Now type the specific file names
+        file_names = ' '.join([f'"output_{i}.gif"' for i in range(start, end + 1)])
+        print(f"📄 Typing file names: {file_names}")
+        
+        # Clear the filename field and type the file names
+        pyautogui.hotkey('ctrl', 'a')
+        copy_to_clipboard(file_names)
+        pyautogui.hotkey('ctrl', 'v')
+        wait_until(lambda: dlg["Edit"].window_text() == file_names, 3, "file names entered")
+        
+        # Click Open button
+        print("🖱 Clicking Open button...")
+        baseline = region_signature(TENOR_PAGE_REGION)
+        dlg["Open"].click()
+        
+        # Wait for the dialog to close and the page to show the selected files
+        print("⏳ Waiting for files to process...")
+        wait_for_window_closed("Open", timeout=10)
+        wait_for_region_change(TENOR_PAGE_REGION, 10, "files shown on page", baseline)
+        wait_for_region_stable(TENOR_PAGE_REGION, 10, "file previews rendered")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error opening files: {e}")
+        return False
+
+@timed("paste_tags")
+def paste_tags_at_coordinates(tags):
+    """
+    Paste ALL 14 tags at each of the 4 coordinates - same tags for all files (including safety coordinate).
+    Returns True if the page settled after submitting (upload finished in time),
+    False if it was submitted but not confirmed within UPLOAD_TIMEOUT.
+    """
+    import pyautogui
+    print("🏷 Pasting ALL 14 tags at each coordinate...")
+    
+    # Convert all tags to a single string separated by spaces
+    all_tags_string = " ".join(tags)
+    print(f"📋 Tags to paste: {all_tags_string}")
+    copy_to_clipboard(all_tags_string)
+    
+    # Updated coordinates for 4 tag fields (3 main + 1 safety)
+    coordinates = [
+        (567, 311),  # Tag field 1
+        (561, 509),  # Tag field 2
+        (564, 709),  # Tag field 3
+        (558, 898),  # Tag field 4 (SAFETY - EXTRA STEP)
+    ]
+    
+    # Paste ALL 14 tags at EACH coordinate (4 times total - including safety)
+    for i in range(4):
+        if i == 3:
+            print(f"🏷 SAFETY STEP: Pasting ALL 14 tags at coordinate {i+1}: ({coordinates[i][0]}, {coordinates[i][1]})")
+        else:
+            print(f"🏷 Pasting ALL 14 tags at coordinate {i+1}: ({coordinates[i][0]}, {coordinates[i][1]})")
+        
+        # Click on tag field
+        pyautogui.click(coordinates[i][0], coordinates[i][1])
+        pause(UI_SETTLE_DELAY, "ui settle")
+        
+        # Paste ALL tags (already on the clipboard)
+        pyautogui.hotkey('ctrl', 'v')
+        pause(UI_SETTLE_DELAY, "ui settle")
+    
+    print("✅ ALL 14 tags pasted at all 4 coordinates successfully (including safety step)!")
+    
+    # Let the tag chips finish rendering before submitting
+    wait_for_region_stable(TENOR_PAGE_REGION, 10, "tags rendered", settle=0.5)
+    
+    # Click upload/submit button
+    print("🖱 Clicking Submit button at (1562, 709)...")
+    baseline = region_signature(TENOR_PAGE_REGION)
+    pyautogui.click(1562, 709)
+    
+    # Wait until the page changes (upload started) and then settles (upload finished)
+    print("⏳ Waiting for upload to finish...")
+    wait_for_region_change(TENOR_PAGE_REGION, 10, "upload started", baseline)
+    return wait_for_region_stable(TENOR_PAGE_REGION, UPLOAD_TIMEOUT, "upload finished", settle=2.0)
+
+@timed("paste_tags")
+def paste_tags_scrolling(tags):
+    """
+    Tag layout "scroll" (10 files per batch): the form is too long for fixed
+    fields, so paste ALL tags into the 5 visible fields (the last 2 are safety
+    fields closed with ESC), scroll down and repeat - 9 times - then submit.
+    Returns True if the page settled after submitting (upload finished in time),
+    False if it was submitted but not confirmed within UPLOAD_TIMEOUT.
+    """
+    import pyautogui
+    print(f"🏷 Pasting tags into the scrolling form ({len(tags)} tags, 9 passes)...")
+    
+    # Let the 10-file form finish rendering before pasting
+    wait_for_region_stable(TENOR_PAGE_REGION, 10, "tag form rendered", settle=1.0)
+    
+    all_tags_string = " ".join(tags)
+    print(f"📋 Tags to paste: {all_tags_string}")
+    copy_to_clipboard(all_tags_string)
+    
+    # Coordinates for 5 tag fields
+    coordinates = [
+        (567, 311),   # Tag field 1
+        (561, 509),   # Tag field 2
+        (564, 709),   # Tag field 3
+        (558, 898),   # Tag field 4 (SAFETY STEP)
+        (567, 1064)   # Tag field 5 (SAFETY STEP)
+    ]
+    
+    for loop_iteration in range(9):
+        print(f"🔄 Pass {loop_iteration + 1}/9")
+        for i, (x, y) in enumerate(coordinates):
+            # Click on tag field and paste ALL tags (already on the clipboard)
+            pyautogui.click(x, y)
+            pause(UI_SETTLE_DELAY, "ui settle")
+            pyautogui.hotkey('ctrl', 'v')
+            pause(UI_SETTLE_DELAY, "ui settle")
+            
+            # Close the suggestion popup of the safety fields
+            if i >= 3:
+                pyautogui.press('esc')
+                pause(UI_SETTLE_DELAY, "ui settle")
+        
+        # Scroll to the next files' fields
+        pyautogui.scroll(-800)
+        wait_for_region_stable(TENOR_PAGE_REGION, 3, "scrolled", settle=0.3)
+    
+    print("✅ Tags pasted for every file in the batch")
+    wait_for_region_stable(TENOR_PAGE_REGION, 10, "tags rendered", settle=0.5)
+    
+    # Click upload/submit button (it sits higher once the form is scrolled down)
+    print("🖱 Clicking Submit button at (1506, 568)...")
+    baseline = region_signature(TENOR_PAGE_REGION)
+    pyautogui.click(1506, 568)
+    
+    print("⏳ Waiting for upload to finish...")
+    wait_for_region_change(TENOR_PAGE_REGION, 10, "upload started", baseline)
+    return wait_for_region_stable(TENOR_PAGE_REGION, UPLOAD_TIMEOUT, "upload finished", settle=2.0)
+
+# Tag form routines of the pyautogui uploader: name -> (paste function, files it can tag per batch)
+TAG_LAYOUTS = {
+    "fields": (paste_tags_at_coordinates, 3),
+    "scroll": (paste_tags_scrolling, 10),
+}
+
+@timed("refresh")
+def wait_and_refresh():
+    """Navigate back to Tenor page for next batch with proper loading"""
+    import pyautogui
+    print("🔄 Navigating back to Tenor page for next batch...")
+    
+    # Navigate to Tenor page in Opera
+    tenor_url = "https://tenor.com/gif-maker?utm_source=nav-bar&utm_medium=internal&utm_campaign=gif-maker-entrypoints"
+    
+    # Click at the new address bar location (283, 79) and select all
+    print("📍 Clicking address bar at (283, 79)...")
+    pyautogui.click(283, 79)
+    pause(UI_SETTLE_DELAY, "ui settle")
+    
+    # Select all text in address bar
+    print("📝 Selecting all text in address bar...")
+    pyautogui.hotkey('ctrl', 'a')
+    
+    # Paste the Tenor URL
+    print("📋 Pasting Tenor URL...")
+    copy_to_clipboard(tenor_url)
+    pyautogui.hotkey('ctrl', 'v')
+    pause(UI_SETTLE_DELAY, "ui settle")
+    baseline = region_signature(TENOR_PAGE_REGION)
+    pyautogui.press('enter')
+    
+    # Wait for the page to start reloading and then stop rendering
+    print("⏳ Waiting for Tenor page to load...")
+    wait_for_region_change(TENOR_PAGE_REGION, 5, "page reload started", baseline)
+    wait_for_region_stable(TENOR_PAGE_REGION, PAGE_LOAD_TIMEOUT, "Tenor page loaded")
+    
+    print("✅ Tenor page loaded successfully!")
+    
+    # FIRST CLICK: Click at (1303, 672) - REQUIRED FOR EVERY BATCH
+    print("🖱 FIRST CLICK at (1303, 672)...")
+    baseline = region_signature(TENOR_PAGE_REGION)
+    pyautogui.click(1303, 672)
+    
+    # Wait for the page to react to the click
+    print("⏳ Waiting for page to react...")
+    wait_for_region_change(TENOR_PAGE_REGION, 5, "page reacted to first click", baseline)
+    wait_for_region_stable(TENOR_PAGE_REGION, 5, "page settled", settle=0.5)
+    
+    # SECOND CLICK: Click at (1846, 968) - REQUIRED FOR EVERY BATCH
+    print("🖱 SECOND CLICK at (1846, 968)...")
+    pyautogui.click(1846, 968)
+    wait_for_region_stable(TENOR_PAGE_REGION, 5, "page settled", settle=0.5)
+    
+    print("✅ Ready for next batch upload!")
+
+def tag_job(job):
+    """
+    Tag step: reuse the tags recorded in the job manifest, else generate them
+    from the YouTube video content with the TAGGER. Returns the tag list.
+    """
+    if job.manifest.tags:
+        job.tags = list(job.manifest.tags)
+        print("⚡ Using the tags recorded in the job manifest")
+    else:
+        job.tags = TAGGERS[TAGGER](job.video_title, job.video_description, job.video_tags, job.video_id)
+        if job.tags:
+            job.manifest.record("tagged", tags=list(job.tags))
+    job.state = "tagged"
+    return job.tags
+
+def process_tenor_upload(job):
+    """
+    Main Tenor upload step for a converted VideoJob: tag it (unless the
+    pipeline already did), then hand the GIFs to the UPLOAD_BACKEND uploader
+    (see UPLOAD_BACKENDS). Already uploaded GIFs are skipped and every
+    finished batch is journaled in the job manifest. Returns the number uploaded.
+    """
+    output_dir, num_gifs, manifest = job.output_dir, job.num_gifs, job.manifest
+    
+    print(f"🚀 Starting Tenor upload automation for {num_gifs} GIFs...")
+    print(f"📁 GIF Directory: {output_dir}")
+    
+    if not job.tags:
+        tag_job(job)
+    
+    # Hand the GIFs and tags to the configured uploader backend
+    uploader = UPLOAD_BACKENDS.get(UPLOAD_BACKEND)
+    if uploader is None:
+        print(f"❌ Unknown upload backend: {UPLOAD_BACKEND}")
+        return 0
+    print(f"📤 Upload backend: {UPLOAD_BACKEND}")
+    with TIMER.span("upload", unit=os.path.basename(output_dir), backend=UPLOAD_BACKEND):
+        uploaded = uploader(output_dir, num_gifs, list(job.tags), manifest)
+    TIMER.count("gifs_uploaded", uploaded)
+    
+    # No GIFs means nothing was uploaded - never mark that as complete
+    complete = num_gifs > 0 and not manifest.pending(num_gifs)
+    any_uploaded = bool(manifest.uploaded)
+    if complete:
+        manifest.record("completed")
+        job.state = "uploaded"
+    # The cleanup tool only deletes folders whose GIFs all made it to Tenor
+    update_upload_status(output_dir, "complete" if complete else ("partial" if any_uploaded else "pending"))
+    return uploaded
+
+class BatchPlanner:
+    """
+    Chooses how many GIFs go into the next upload batch.
+
+    Every batch costs a fixed overhead (page reload, clicks, cooldown) plus a
+    per-file upload time, so bigger batches give more GIFs per minute. The
+    planner fits "batch seconds = overhead + files * per_file" from the
+    batches it has seen, grows the batch by one after each success, halves
+    it after a failure, and never exceeds BATCH_SIZE_MAX, BATCH_MAX_BYTES or
+    BATCH_MAX_SECONDS. A batch whose upload was submitted but not confirmed
+    keeps the size where it is. Every decision is kept in .decisions so the
+    throughput / error-rate trade-off can be tuned.
+    """
+
+    def __init__(self, initial_size=None, min_size=None, max_size=None,
+                 max_bytes=None, max_seconds=None):
+        self.max_size = max_size or BATCH_SIZE_MAX
+        self.min_size = min(min_size or BATCH_SIZE_MIN, self.max_size)
+        self.max_bytes = max_bytes or BATCH_MAX_BYTES
+        self.max_seconds = max_seconds or BATCH_MAX_SECONDS
+        self.size = max(self.min_size, min(initial_size or BATCH_SIZE_INITIAL, self.max_size))
+        self.samples = []  # (files, seconds) of successful batches
+        self.decisions = []
+        self.failures = 0
+        self.successes = 0
+
+    def estimate(self):
+        """Return (overhead_seconds, per_file_seconds) fitted from the samples, or (None, None)"""
+        if not self.samples:
+            return None, None
+        if len({files for files, _ in self.samples}) < 2:
+            # Only one batch size seen so far - cannot separate overhead from per-file time
+            files, seconds = self.samples[-1]
+            return None, seconds / files
+
+        # Least squares fit of seconds = overhead + files * per_file
+        count = len(self.samples)
+        mean_files = sum(files for files, _ in self.samples) / count
+        mean_seconds = sum(seconds for _, seconds in self.samples) / count
+        variance = sum((files - mean_files) ** 2 for files, _ in self.samples)
+        covariance = sum((files - mean_files) * (seconds - mean_seconds) for files, seconds in self.samples)
+        per_file = max(covariance / variance, 0.0)
+        overhead = max(mean_seconds - per_file * mean_files, 0.0)
+        return overhead, per_file
+
+    def next_batch_size(self, remaining_sizes):
+        """
+        Decide how many of the remaining files (list of their byte sizes, in
+        upload order) go into the next batch.
+        """
+        size = min(self.size, len(remaining_sizes))
+        reason = "planned size"
+
+        # Byte budget
+        total_bytes = 0
+        for index, file_bytes in enumerate(remaining_sizes[:size]):
+            if index >= self.min_size and total_bytes + file_bytes > self.max_bytes:
+                size = index
+                reason = "byte budget"
+                break
+            total_bytes += file_bytes
+
+        # Time budget from the observed latency
+        overhead, per_file = self.estimate()
+        predicted = None
+        if per_file:
+            time_cap = int((self.max_seconds - (overhead or 0)) / per_file)
+            if time_cap < size:
+                size = max(self.min_size, time_cap)
+                reason = "time budget"
+            predicted = (overhead or 0) + size * per_file
+
+        # Avoid leaving a tiny last batch that pays the full overhead on its own
+        leftover = len(remaining_sizes) - size
+        if 0 < leftover < self.min_size + 1 and size + leftover <= self.max_size and reason == "planned size":
+            size += leftover
+            reason = "absorbed remainder"
+
+        decision = {
+            "batch": len(self.decisions) + 1,
+            "size": size,
+            "reason": reason,
+            "bytes": sum(remaining_sizes[:size]),
+            "predicted_seconds": round(predicted, 1) if predicted else None,
+        }
+        self.decisions.append(decision)
+        predicted_text = f", ~{decision['predicted_seconds']}s" if predicted else ""
+        print(f"🧮 Batch planner: {size} file(s), {decision['bytes'] / 1048576:.1f} MB ({reason}{predicted_text})")
+        return size
+
+    def record(self, files, seconds, success, confirmed=True):
+        """
+        Feed back how a batch went; adjusts the next batch size.
+        confirmed=False: submitted, but the page never showed the upload finish
+        (the time is not a usable sample and the size is not grown).
+        """
+        self.decisions[-1].update({"seconds": round(seconds, 1), "success": success, "confirmed": confirmed})
+        if success and not confirmed:
+            self.successes += 1
+            print(f"⚠️  Batch upload not confirmed - keeping the next batch at {self.size}")
+        elif success:
+            self.successes += 1
+            self.samples.append((files, seconds))
+            self.size = min(self.size + 1, self.max_size)
+        else:
+            self.failures += 1
+            self.size = max(self.min_size, self.size // 2)
+            print(f"📉 Batch failed - shrinking next batch to {self.size}")
+
+    def summary(self):
+        """Throughput and error rate of the batches planned so far"""
+        finished = [d for d in self.decisions if "seconds" in d]
+        total_seconds = sum(d["seconds"] for d in finished)
+        uploaded = sum(d["size"] for d in finished if d["success"])
+        overhead, per_file = self.estimate()
+        return {
+            "batches": len(finished),
+            "files_uploaded": uploaded,
+            "error_rate": round(self.failures / len(finished), 3) if finished else 0.0,
+            "gifs_per_minute": round(uploaded / total_seconds * 60, 2) if total_seconds else 0.0,
+            "overhead_seconds": round(overhead, 1) if overhead is not None else None,
+            "per_file_seconds": round(per_file, 1) if per_file is not None else None,
+            "decisions": list(self.decisions),
+        }
+
+def upload_with_pyautogui(output_dir, num_gifs, tags, manifest=None):
+    """
+    UPLOAD BACKEND "pyautogui": drive the Tenor GIF maker in Opera with mouse
+    and keyboard. Batch sizes come from BatchPlanner (starting at
+    BATCH_SIZE_INITIAL, at most what the TAG_LAYOUT can tag so every file gets tags);
+    batches whose files could not be opened are re-queued up to BATCH_RETRIES
+    times. A batch that was submitted is never re-sent, even if the page did not
+    confirm the upload in time - that would upload the same GIFs twice.
+    The same tags are pasted for every batch. Returns the number of GIFs submitted.
+    """
+    import pyautogui
+    # output_N.gif numbers still to upload
+    pending = manifest.pending(num_gifs) if manifest else list(range(1, num_gifs + 1))
+    if not pending:
+        print("✅ Every GIF was already uploaded (job manifest)")
+        return 0
+    
+    # Navigate to Tenor and click the specified buttons
+    navigate_to_tenor()
+    uploaded = 0
+    
+    paste_tags, taggable_files = TAG_LAYOUTS[TAG_LAYOUT]
+    planner = BatchPlanner(max_size=min(BATCH_SIZE_MAX, taggable_files))
+    attempts = {}
+    batch_num = 0
+    opened_any = False  # The Open dialog remembers the GIF folder once a batch was opened from it
+    
+    print(f"📦 {len(pending)} of {num_gifs} GIFs to upload, first batch of {planner.size}")
+    
+    while pending:
+        # Navigate back to Tenor page before every batch but the first
+        if batch_num > 0:
+            wait_and_refresh()
+        
+        # Files are selected by name range, so a batch is a run of consecutive numbers
+        run = 1
+        while run < len(pending) and pending[run] == pending[run - 1] + 1:
+            run += 1
+        sizes = []
+        for number in pending[:run]:
+            path = os.path.join(output_dir, f"output_{number}.gif")
+            sizes.append(os.path.getsize(path) if os.path.exists(path) else 0)
+        files_in_batch = planner.next_batch_size(sizes)
+        start_file = pending[0]
+        end_file = start_file + files_in_batch - 1
+        
+        print(f"\n{'='*50}")
+        print(f"📦 Processing Batch {batch_num + 1} (output_{start_file} to output_{end_file}, {len(pending)} left)")
+        print(f"{'='*50}")
+        
+        # Ensure Opera is focused
+        pyautogui.click(960, 540)
+        pause(UI_SETTLE_DELAY, "ui settle")
+        
+        print(f"📄 This batch contains {files_in_batch} file(s)")
+        batch_started = time.time()
+        
+        # Click upload area
+        click_upload_area()
+        
+        # Open files batch with new navigation method
+        # (only a batch that could not be opened counts as failed)
+        success = False
+        confirmed = True
+        if open_files_batch_new(start_file, end_file, output_dir, navigate=not opened_any):
+            print(f"✅ Successfully opened files {start_file} to {end_file}")
+            opened_any = True
+            
+            # Click next coordinate and wait for the tag form to appear
+            baseline = region_signature(TENOR_PAGE_REGION)
+            pyautogui.click(1844, 978)
+            wait_for_region_change(TENOR_PAGE_REGION, 5, "tag form opened", baseline)
+            wait_for_region_stable(TENOR_PAGE_REGION, 5, "tag form rendered", settle=0.5)
+            
+            # Paste ALL 14 tags for every file (same tags for every batch)
+            confirmed = paste_tags(tags)
+            success = True
+        else:
+            print(f"❌ Failed to open batch {batch_num + 1}")
+        
+        planner.record(files_in_batch, time.time() - batch_started, success, confirmed)
+        batch_files = pending[:files_in_batch]
+        pending = pending[files_in_batch:]
+        if success:
+            uploaded += files_in_batch
+            if manifest:
+                manifest.mark_uploaded(batch_files, batch=batch_num + 1)
+        else:
+            # Put the files back (in front) for a retry with a smaller batch
+            retry = [number for number in batch_files if attempts.get(number, 0) < BATCH_RETRIES]
+            for number in retry:
+                attempts[number] = attempts.get(number, 0) + 1
+            pending = retry + pending
+            if len(retry) < len(batch_files):
+                print(f"⚠️  Giving up on {len(batch_files) - len(retry)} file(s) after {BATCH_RETRIES} retries")
+        batch_num += 1
+    
+    summary = planner.summary()
+    print("🎉 All batches processed! Upload completed.")
+    print(f"📊 Batch planner: {summary['batches']} batches, {summary['gifs_per_minute']} GIFs/min, "
+          f"error rate {summary['error_rate']:.0%}, overhead {summary['overhead_seconds']}s, "
+          f"per file {summary['per_file_seconds']}s")
+    return uploaded
+
+def build_multipart_body(fields, file_field, file_path):
+    """
+    Encode form fields plus one file as multipart/form-data.
+    Returns: (bytes_body, str_content_type)
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+
+    filename = os.path.basename(file_path)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    with open(file_path, "rb") as f:
+        file_bytes = f.read()
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'.encode("utf-8")
+    )
+    parts.append(file_bytes)
+    parts.append(f"\r\n--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+@timed("http_upload")
+def upload_gif_http(gif_path, tags):
+    """
+    POST one GIF and its tags to HTTP_UPLOAD_URL, retrying with exponential
+    backoff up to HTTP_UPLOAD_RETRIES times.
+    Returns: (bool_success, str_message)
+    """
+    fields = {
+        "api_key": HTTP_UPLOAD_API_KEY,
+        # GIPHY-style tags: comma separated, no leading '#'
+        "tags": ",".join(tag.lstrip("#") for tag in tags),
+    }
+    body, content_type = build_multipart_body(fields, "file", gif_path)
+
+    last_error = ""
+    for attempt in range(1, HTTP_UPLOAD_RETRIES + 1):
+        request = urllib.request.Request(HTTP_UPLOAD_URL, data=body, method="POST",
+                                         headers={"Content-Type": content_type})
+        try:
+            with urllib.request.urlopen(request, timeout=HTTP_UPLOAD_TIMEOUT) as response:
+                return True, response.read(200).decode("utf-8", "replace")
+        except urllib.error.HTTPError as e:
+            last_error = f"HTTP {e.code}"
+            # Client errors (bad key, bad file) will not fix themselves
+            if 400 <= e.code < 500 and e.code != 429:
+                break
+        except (urllib.error.URLError, OSError) as e:
+            last_error = str(e)
+        if attempt < HTTP_UPLOAD_RETRIES:
+            pause(2 ** (attempt - 1), "http retry backoff")
+    return False, last_error
+
+def upload_with_http(output_dir, num_gifs, tags, manifest=None):
+    """
+    UPLOAD BACKEND "http": POST every output_N.gif directly to HTTP_UPLOAD_URL,
+    HTTP_UPLOAD_WORKERS at a time. No browser, mouse or keyboard involved.
+    Returns the number of GIFs uploaded.
+    """
+    numbers = manifest.pending(num_gifs) if manifest else range(1, num_gifs + 1)
+    gif_paths = [os.path.join(output_dir, f"output_{i}.gif") for i in numbers]
+    gif_paths = [path for path in gif_paths if os.path.exists(path)]
+    print(f"🌐 Uploading {len(gif_paths)} GIFs over HTTP ({HTTP_UPLOAD_WORKERS} at a time) to {HTTP_UPLOAD_URL}")
+
+    uploaded = 0
+    with ThreadPoolExecutor(max_workers=HTTP_UPLOAD_WORKERS) as pool:
+        futures = {pool.submit(upload_gif_http, path, tags): path for path in gif_paths}
+        for future in as_completed(futures):
+            name = os.path.basename(futures[future])
+            ok, message = future.result()
+            if ok:
+                print(f"✅ Uploaded: {name}")
+                uploaded += 1
+                if manifest:
+                    manifest.mark_uploaded([gif_number(futures[future])])
+            else:
+                print(f"❌ Upload failed: {name} - {message}")
+
+    print(f"📊 Uploaded {uploaded}/{len(gif_paths)} GIFs over HTTP")
+    return uploaded
+
+@timed("browser_session")
+def browser_upload_session(session_number, batches, tags, manifest=None):
+    """
+    Run ONE headless browser session and upload its share of the batches.
+    The file input is filled directly (no OS "Open" dialog) and every step
+    waits on a DOM selector instead of screen coordinates.
+    Returns the number of GIFs uploaded by this session.
+    """
+    from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeout
+
+    all_tags_string = " ".join(tags)
+    uploaded = 0
+    profile_dir = os.path.join(BROWSER_PROFILE_DIR, f"session_{session_number}")
+    os.makedirs(profile_dir, exist_ok=True)
+
+    with sync_playwright() as playwright:
+        # Persistent profile per session keeps each session logged in
+        context = playwright.chromium.launch_persistent_context(profile_dir, headless=BROWSER_HEADLESS)
+        context.set_default_timeout(BROWSER_TIMEOUT_MS)
+        page = context.new_page()
+        try:
+            for batch in batches:
+                names = ", ".join(os.path.basename(path) for path in batch)
+                try:
+                    if page.is_closed():  # Crashed or closed during an earlier batch
+                        page = context.new_page()
+                    page.goto(BROWSER_UPLOAD_URL)
+                    page.wait_for_selector(BROWSER_SELECTORS["file_input"], state="attached")
+                    page.set_input_files(BROWSER_SELECTORS["file_input"], batch)
+
+                    page.wait_for_selector(BROWSER_SELECTORS["tag_input"])
+                    for tag_field in page.locator(BROWSER_SELECTORS["tag_input"]).all():
+                        tag_field.fill(all_tags_string)
+
+                    page.click(BROWSER_SELECTORS["submit"])
+                    page.wait_for_selector(BROWSER_SELECTORS["done"])
+                    print(f"✅ [session {session_number}] Uploaded: {names}")
+                    uploaded += len(batch)
+                    if manifest:
+                        manifest.mark_uploaded([gif_number(path) for path in batch])
+                except PlaywrightTimeout as e:
+                    print(f"❌ [session {session_number}] Timed out on {names}: {str(e)[:100]}")
+                    if manifest:
+                        manifest.mark_failed([gif_number(path) for path in batch], f"timeout: {str(e)[:200]}")
+                except PlaywrightError as e:
+                    # Missing selector target, closed page, failed navigation... - go on with the next batch
+                    print(f"❌ [session {session_number}] Browser error on {names}: {str(e)[:100]}")
+                    if manifest:
+                        manifest.mark_failed([gif_number(path) for path in batch], str(e)[:200])
+        finally:
+            context.close()
+
+    return uploaded
+
+def upload_with_browser(output_dir, num_gifs, tags, manifest=None):
+    """
+    UPLOAD BACKEND "browser": split the GIFs into batches of BROWSER_BATCH_SIZE
+    and spread them over BROWSER_SESSIONS headless browser sessions running
+    in parallel. Needs playwright (pip install playwright && playwright install chromium).
+    Returns the number of GIFs uploaded.
+    """
+    numbers = manifest.pending(num_gifs) if manifest else range(1, num_gifs + 1)
+    gif_paths = [os.path.join(output_dir, f"output_{i}.gif") for i in numbers]
+    gif_paths = [os.path.abspath(path) for path in gif_paths if os.path.exists(path)]
+    batches = [gif_paths[i:i + BROWSER_BATCH_SIZE] for i in range(0, len(gif_paths), BROWSER_BATCH_SIZE)]
+    if not batches:
+        print("⚠️  No GIFs to upload")
+        return 0
+
+    sessions = min(BROWSER_SESSIONS, len(batches))
+    print(f"🧭 Uploading {len(gif_paths)} GIFs in {len(batches)} batches over {sessions} headless session(s)")
+
+    # Round-robin the batches so every session gets a similar amount of work
+    session_batches = [batches[i::sessions] for i in range(sessions)]
+
+    uploaded = 0
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(browser_upload_session, i + 1, session_batches[i], tags, manifest) for i in range(sessions)]
+        for future in as_completed(futures):
+            try:
+                uploaded += future.result()
+            except ImportError:
+                print("❌ playwright is not installed - run: pip install playwright && playwright install chromium")
+            except Exception as e:
+                print(f"❌ Browser session failed: {e}")
+
+    print(f"📊 Uploaded {uploaded}/{len(gif_paths)} GIFs with headless browsers")
+    return uploaded
+
+UPLOAD_BACKENDS = {
+    "pyautogui": upload_with_pyautogui,
+    "http": upload_with_http,
+    "browser": upload_with_browser,
+}
+
+class JobManifest:
+    """
+    Append-only JSON-lines journal of one video's progress, one file per URL
+    in MANIFEST_DIR. Replaying it tells a re-run which units of work are
+    already done: download, conversion, tags and every uploaded output_N.gif.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.path = os.path.join(MANIFEST_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".jsonl")
+        self.download = None    # video_path, video_title, video_description, video_tags
+        self.conversion = None  # output_dir, num_gifs
+        self.tags = None
+        self.uploaded = set()   # output_N.gif numbers uploaded since the last conversion
+        self.completed = False
+        self._lock = threading.Lock()
+        self._torn_tail = False  # Last line was cut off mid-write; start the next entry on a new line
+        if MANIFEST_ENABLED:
+            self._replay()
+
+    def _replay(self):
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                self._torn_tail = not line.endswith("\n")
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    continue  # Half-written last line from a crash
+        if self.download or self.conversion:
+            print(f"📒 Resuming from job manifest: {os.path.basename(self.path)}")
+
+    def _apply(self, entry):
+        event = entry.get("event")
+        if event == "downloaded":
+            self.download = {key: entry.get(key) for key in ("video_path", "video_title", "video_description", "video_tags")}
+        elif event == "converted":
+            # New GIFs invalidate everything uploaded from the old ones
+            self.conversion = {"output_dir": entry.get("output_dir"), "num_gifs": entry.get("num_gifs", 0)}
+            self.uploaded = set()
+            self.completed = False
+        elif event == "tagged":
+            self.tags = entry.get("tags")
+        elif event == "uploaded":
+            self.uploaded.update(entry.get("files", []))
+        elif event == "completed":
+            self.completed = True
+
+    def record(self, event, **data):
+        """Apply an event and append it to the journal (flushed to disk immediately)"""
+        entry = {"event": event, "time": round(time.time(), 3), **data}
+        with self._lock:
+            self._apply(entry)
+            if not MANIFEST_ENABLED:
+                return
+            try:
+                os.makedirs(MANIFEST_DIR, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    if self._torn_tail:
+                        f.write("\n")
+                        self._torn_tail = False
+                    f.write(json.dumps(entry) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"⚠️  Could not write job manifest: {e}")
+
+    def mark_uploaded(self, numbers, batch=None):
+        """Record output_N.gif numbers that were uploaded (in batch, if known)"""
+        self.record("uploaded", files=sorted(numbers), batch=batch)
+
+    def mark_failed(self, numbers, error, batch=None):
+        """Record output_N.gif numbers whose upload failed (they stay pending)"""
+        self.record("upload_failed", files=sorted(numbers), error=error, batch=batch)
+
+    def pending(self, num_gifs):
+        """output_N.gif numbers (1..num_gifs) not uploaded yet"""
+        with self._lock:
+            return [number for number in range(1, num_gifs + 1) if number not in self.uploaded]
+
+def exclusive_bytes(path):
+    """
+    Bytes deleting path (a file or folder) would really free: files that are
+    hard-linked elsewhere too (e.g. conversion cache clips) free nothing.
+    """
+    paths = [path] if os.path.isfile(path) else [os.path.join(root, name) for root, _, files in os.walk(path) for name in files]
+    total = 0
+    for file_path in paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        if stat.st_nlink <= 1:
+            total += stat.st_size
+    return total
+
+def retained_files():
+    """
+    Every file the storage budget covers: downloaded videos (top level of
+    DOWNLOADS_DIR, without the .json/.jsonl bookkeeping), the .gifs folders
+    and the conversion cache.
+    """
+    try:
+        with os.scandir(DOWNLOADS_DIR) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith((".json", ".jsonl")):
+                    yield entry.path
+    except OSError:
+        pass
+    folders = [CONVERSION_CACHE_DIR]
+    try:
+        folders += [os.path.join(GIF_ROOT_DIR, name) for name in os.listdir(GIF_ROOT_DIR) if name.endswith(".gifs")]
+    except OSError:
+        pass
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for name in files:
+                yield os.path.join(root, name)
+
+def retained_bytes():
+    """Size of retained_files(), counting hard-linked files (shared inodes) once"""
+    seen = set()
+    total = 0
+    for path in retained_files():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        inode = (stat.st_dev, stat.st_ino)
+        if stat.st_ino and inode in seen:
+            continue
+        seen.add(inode)
+        total += stat.st_size
+    return total
+
+class RetentionManager:
+    """
+    Keeps downloaded videos + .gifs folders + the conversion cache (see
+    retained_files) under STORAGE_BUDGET_GB by deleting finished work,
+    oldest first (see RETENTION_ORDER), then unused cache clips.
+
+    Only GIF folders whose conversion marker says upload "complete" are
+    candidates, each together with its source video. Videos and folders the
+    pipeline still has in flight are protect()ed until the upload stage
+    release()s them, so nothing pending is ever evicted.
+    """
+
+    def __init__(self, budget_gb=None):
+        budget_gb = STORAGE_BUDGET_GB if budget_gb is None else budget_gb
+        self.budget = int(budget_gb * 1024 ** 3) if budget_gb else None
+        self._protected = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def protect(self, *paths):
+        """Never evict these paths until they are released"""
+        with self._lock:
+            self._protected.update(self._key(path) for path in paths if path)
+
+    def release(self, *paths):
+        with self._lock:
+            self._protected.difference_update(self._key(path) for path in paths if path)
+
+    def candidates(self):
+        """Fully uploaded GIF folders (+ source video), in eviction order"""
+        downloads_root = self._key(DOWNLOADS_DIR)
+        found = []
+        try:
+            names = os.listdir(GIF_ROOT_DIR)
+        except OSError:
+            return found
+        for name in names:
+            folder = os.path.join(GIF_ROOT_DIR, name)
+            if not name.endswith(".gifs") or not os.path.isdir(folder):
+                continue
+            marker = read_conversion_marker(folder)
+            if not marker or marker.get("upload") != "complete":
+                continue
+            video = marker.get("source_path")
+            # Only videos we downloaded ourselves are deleted along with the GIFs
+            if not video or not os.path.isfile(video) or os.path.dirname(self._key(video)) != downloads_root:
+                video = None
+            if RETENTION_ORDER == "lru":
+                paths = [folder] + ([video] if video else [])
+                order = max(os.stat(path).st_atime for path in paths)
+            else:
+                order = marker.get("uploaded_at") or os.path.getmtime(os.path.join(folder, CONVERSION_MARKER))
+            found.append({"folder": folder, "video": video, "order": order})
+        found.sort(key=lambda item: item["order"])
+        return found
+
+    @timed("retention")
+    def over_budget(self):
+        """True if the retained storage is above the budget"""
+        return bool(self.budget) and retained_bytes() > self.budget
+
+    def enforce(self):
+        """Evict finished work until under budget. Returns the bytes freed."""
+        if not self.budget:
+            return 0
+        used = retained_bytes()
+        if used <= self.budget:
+            return 0
+
+        print(f"🧹 Storage {used / 1024 ** 3:.2f} GB over budget {self.budget / 1024 ** 3:.2f} GB - evicting uploaded work")
+        freed = 0
+        for item in self.candidates():
+            if used - freed <= self.budget:
+                break
+            with self._lock:
+                paths = [item["folder"]] + ([item["video"]] if item["video"] else [])
+                if any(self._key(path) in self._protected for path in paths):
+                    continue
+                # Clips still hard-linked from the cache free nothing here
+                size = exclusive_bytes(item["folder"])
+                try:
+                    shutil.rmtree(item["folder"])
+                except OSError as e:
+                    print(f"⚠️  Could not evict {item['folder']}: {e}")
+                    continue
+                freed += size
+                if item["video"]:
+                    try:
+                        size = exclusive_bytes(item["video"])
+                        os.remove(item["video"])
+                        freed += size
+                    except OSError as e:
+                        print(f"⚠️  Could not evict {item['video']}: {e}")
+            print(f"🗑️  Evicted {os.path.basename(item['folder'])}" +
+                  (f" + {os.path.basename(item['video'])}" if item["video"] else ""))
+
+        if used - freed > self.budget:
+            freed += self.evict_cache(used - freed - self.budget)
+        if used - freed > self.budget:
+            print("⚠️  Still over the storage budget - everything left is pending or in use")
+        print(f"🧹 Freed {freed / 1024 ** 2:.1f} MB")
+        return freed
+
+    def evict_cache(self, needed):
+        """
+        Delete conversion cache clips no GIF folder links to any more, least
+        recently used first, until needed bytes are freed. Returns the bytes freed.
+        """
+        entries = []
+        try:
+            with os.scandir(CONVERSION_CACHE_DIR) as it:
+                for entry in it:
+                    stat = entry.stat()
+                    # Deleting a clip that is still linked from a folder frees nothing
+                    if entry.is_file() and stat.st_nlink <= 1:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return 0
+        freed = 0
+        for _, size, path in sorted(entries):
+            if freed >= needed:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            freed += size
+        if freed:
+            print(f"🗑️  Evicted {freed / 1024 ** 2:.1f} MB of unused conversion cache clips")
+        return freed
+
+RETENTION = RetentionManager()
+
+class VideoJob:
+    """
+    One video on its way through the stages. Every stage reads and fills its
+    own job (download result, GIF folder and count, tags, state) instead of
+    module globals, so several videos can be in different stages at once.
+    state: "new" -> "downloaded" -> "converted" -> "tagged" -> "uploaded",
+    "failed" (see error) or "done" (the manifest says it was uploaded already).
+    """
+
+    def __init__(self, url, index=0, total=1):
+        self.url = url
+        self.index = index
+        self.total = total
+        self.manifest = JobManifest(url)
+        self.video_path = None
+        self.video_title = None
+        self.video_description = None
+        self.video_tags = None
+        self.output_dir = None
+        self.num_gifs = 0
+        self.tags = []
+        self.state = "done" if self.manifest.completed else "new"
+        self.error = None
+
+    @property
+    def video_id(self):
+        return extract_video_id(self.video_path) if self.video_path else None
+
+    def fail(self, error):
+        self.state = "failed"
+        self.error = error
+
+    @classmethod
+    def failed(cls, url, index, total, error):
+        """A job that could not even be set up (e.g. unreadable manifest), already failed"""
+        job = cls.__new__(cls)
+        job.url, job.index, job.total = url, index, total
+        job.manifest = None
+        job.video_path = job.video_title = job.video_description = job.video_tags = None
+        job.output_dir = None
+        job.num_gifs = 0
+        job.tags = []
+        job.fail(error)
+        return job
+
+def gif_number(gif_path):
+    """output_N.gif -> N"""
+    return int(re.search(r"output_(\d+)\.gif$", gif_path).group(1))
+
+def resume_download(url, manifest, ydl=None):
+    """
+    Download url unless the manifest says it was downloaded and the file is
+    still there. Returns: (video_path, video_title, video_description, video_tags)
+    """
+    if manifest.download and manifest.download["video_path"] and os.path.exists(manifest.download["video_path"]):
+        print("⚡ Already downloaded (job manifest) - skipping download")
+        download = manifest.download
+        return download["video_path"], download["video_title"], download["video_description"], download["video_tags"]
+
+    downloader = DOWNLOADERS[DOWNLOADER]
+    with TIMER.span("download", unit=url):
+        video_path, video_title, video_description, video_tags = downloader(url, ydl=ydl)
+    if video_path and os.path.exists(video_path):
+        TIMER.count("bytes_downloaded", os.path.getsize(video_path))
+        manifest.record("downloaded", video_path=video_path, video_title=video_title,
+                        video_description=video_description, video_tags=video_tags)
+    return video_path, video_title, video_description, video_tags
+
+def resume_conversion(video_path, output_dir, manifest):
+    """
+    Convert video_path into output_dir unless its conversion marker shows the
+    GIFs there came from this exact source and settings.
+    Returns the number of GIFs to upload.
+    """
+    # Folder contents count only if made from this exact source with these settings
+    num_gifs = existing_conversion(video_path, output_dir)
+    if num_gifs is not None:
+        conversion = manifest.conversion
+        if conversion and conversion["output_dir"] == output_dir and conversion["num_gifs"] == num_gifs:
+            print(f"⚡ Already converted (job manifest): {num_gifs} GIFs, "
+                  f"{len(manifest.uploaded)} uploaded so far")
+            return num_gifs
+        print(f"✅ GIFs already exist for this exact source and settings: {num_gifs} GIF files.")
+    else:
+        with TIMER.span("convert", unit=os.path.basename(output_dir)):
+            num_gifs = video_to_gifs(video_path, output_dir)
+        TIMER.count("gifs_created", num_gifs)
+        TIMER.count("bytes_converted", os.path.getsize(video_path))
+
+    if num_gifs:
+        manifest.record("converted", output_dir=output_dir, num_gifs=num_gifs)
+    return num_gifs
+
+def download_job(job, ydl=None):
+    """Download step: fill in the job's video and GIF folder. Returns True on success."""
+    job.video_path, job.video_title, job.video_description, job.video_tags = resume_download(job.url, job.manifest, ydl=ydl)
+    if not job.video_path or not os.path.exists(job.video_path):
+        job.fail("download failed")
+        return False
+    # Create folder name from video title (sanitized) - without underscores, with .gifs extension
+    job.output_dir = gif_output_dir_for(job.video_title, job.video_path)
+    job.state = "downloaded"
+    return True
+
+def convert_job(job):
+    """Conversion step: fill in the job's GIF count. Returns True if there are GIFs to upload."""
+    job.num_gifs = resume_conversion(job.video_path, job.output_dir, job.manifest)
+    if not job.num_gifs:
+        job.fail("no GIFs created")
+        return False
+    job.state = "converted"
+    return True
+
+def process_single_video(url, total_videos, current_index):
+    """Process a single video: download, convert to GIFs, and upload to Tenor"""
+    print(f"\n{'='*60}")
+    print(f"🎬 PROCESSING VIDEO {current_index + 1} OF {total_videos}")
+    print(f"🔗 URL: {url}")
+    print(f"{'='*60}")
+    
+    job = VideoJob(url, current_index, total_videos)
+    if job.state == "done":
+        print("✅ Already uploaded (job manifest) - skipping. Delete its manifest to redo it.")
+        return True
+    
+    # Nothing else is in flight here, so any fully uploaded work may go
+    RETENTION.enforce()
+    
+    # Step 1: Download video from URL
+    print("🎥 VIDEO DOWNLOADER & GIF CONVERTER")
+    print("=" * 40)
+    
+    # Download the video and get the title, description, and tags
+    if not download_job(job):
+        print("❌ Video download failed. Skipping to next video.")
+        return False
+
+    print(f"📁 Downloaded video: {job.video_path}")
+    print(f"🎬 Video title: {job.video_title}")
+    if job.video_description:
+        print(f"📝 Video description: {job.video_description[:100]}...")
+    if job.video_tags:
+        print(f"🏷 Video tags: {', '.join(job.video_tags[:5])}...")
+    
+    # Step 2: Convert to GIFs
+    print("\n" + "=" * 40)
+    print("🔄 CONVERTING TO GIFS")
+    print("=" * 40)
+    
+    print(f"🎯 Creating GIFs in: {job.output_dir}")
+    
+    # Skips the conversion if the manifest or the folder shows it is done
+    if not convert_job(job):
+        print("❌ No GIFs were created. Skipping to next video.")
+        return False
+    print(f"📊 Total GIFs to upload: {job.num_gifs}")
+    
+    # Step 3: Automatic Tenor upload start after a short countdown
+    print("\n" + "=" * 50)
+    print("🤖 TENOR UPLOAD AUTOMATION")
+    print("=" * 50)
+    
+    if UPLOAD_BACKEND == "pyautogui":
+        print("⚠  WARNING: Do not move mouse or keyboard during automation!")
+        print(f"🚀 Starting Tenor automation in {START_COUNTDOWN_SECONDS} seconds...")
+        
+        # Countdown
+        for i in range(START_COUNTDOWN_SECONDS, 0, -1):
+            print(f"Starting in {i} seconds...")
+            pause(1, "start countdown")
+    
+    print("🎬 Starting automation NOW!")
+    
+    # Safety settings for pyautogui
+    if UPLOAD_BACKEND == "pyautogui":
+        import pyautogui
+        pyautogui.FAILSAFE = True
+    
+    try:
+        # Start Tenor upload automation with YouTube video context
+        process_tenor_upload(job)
+        
+        print(f"\n🎉 Video {current_index + 1} processing completed successfully!")
+        print(f"📁 Video downloaded to: {job.video_path}")
+        print(f"📁 GIFs saved to: {job.output_dir}")
+        print(f"📊 Total GIFs created: {job.num_gifs}")
+        if job.tags:
+            print(f"🏷 Tags generated: {', '.join(job.tags)}")
+        return True
+            
+    except KeyboardInterrupt:
+        print("\n🛑 Automation interrupted by user!")
+        return False
+    except Exception as e:
+        print(f"\n❌ Unexpected error during automation: {e}")
+        print("💡 Tip: If automation failed, check if all required packages are installed.")
+        return False
+
+def download_one(url, index, total):
+    """
+    Download one URL into a VideoJob (runs in a download worker).
+    Never raises: a failing URL only fails its own job.
+    """
+    job = None
+    try:
+        job = VideoJob(url, index, total)
+        if job.state != "done" and download_job(job, ydl=thread_downloader()):
+            RETENTION.protect(job.video_path, job.output_dir)
+    except Exception as e:
+        print(f"❌ Download failed for {url}: {e}")
+        if job is None:
+            job = VideoJob.failed(url, index, total, f"download failed: {e}")
+        else:
+            job.fail(f"download failed: {e}")
+    return job
+
+def download_stage(urls, convert_queue, max_workers=None):
+    """
+    PIPELINE STAGE 1: download the URLs with up to max_workers (default
+    DOWNLOAD_WORKERS) at once and hand their VideoJobs to the converter in
+    URL order. A new download only starts when an earlier one was handed
+    over, so at most max_workers videos are ahead of the bounded queue.
+    Eviction only runs while no download is in flight.
+    A failing URL only fails its own job; the end marker is always queued.
+    """
+    max_workers = max_workers or DOWNLOAD_WORKERS
+    in_flight = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for index, url in enumerate(urls):
+                print(f"\n📥 [download {index + 1}/{len(urls)}] {url}")
+                try:
+                    # A running download is only protected once it finishes, so
+                    # let the running ones finish before anything is evicted
+                    running = [future for future in in_flight if not future.done()]
+                    if running and RETENTION.over_budget():
+                        wait(running)
+                    # Evicting only from this thread keeps eviction decisions in URL order
+                    RETENTION.enforce()
+                except Exception as e:
+                    print(f"⚠️  Storage budget check failed: {e}")
+                in_flight.append(pool.submit(download_one, url, index, len(urls)))
+
+                if len(in_flight) >= max_workers:
+                    # Blocks while the converter is PIPELINE_QUEUE_SIZE videos behind
+                    convert_queue.put(in_flight.pop(0).result())
+
+            while in_flight:
+                convert_queue.put(in_flight.pop(0).result())
+    finally:
+        close_downloaders()
+        convert_queue.put(None)
+
+def convert_stage(convert_queue, upload_queue):
+    """
+    PIPELINE STAGE 2: turn each downloaded video into GIFs and tag it, so the
+    upload stage only has to upload.
+    """
+    try:
+        while True:
+            job = convert_queue.get()
+            if job is None:
+                break
+
+            if job.state == "downloaded":
+                print(f"\n🔄 [convert {job.index + 1}] {job.video_title} -> {job.output_dir}")
+                try:
+                    if convert_job(job):
+                        tag_job(job)
+                except Exception as e:
+                    print(f"❌ Conversion failed: {e}")
+                    if job.state == "downloaded":
+                        job.fail("conversion failed")
+
+            upload_queue.put(job)
+    finally:
+        # Always unblock the upload stage, even if this thread dies
+        upload_queue.put(None)
+
+def upload_stage(upload_queue, total_videos):
+    """
+    PIPELINE STAGE 3: upload each converted video to Tenor.
+    Runs on the main thread because the browser automation owns mouse and keyboard.
+    Returns the number of videos uploaded successfully.
+    """
+    successful_processed = 0
+    countdown_done = False
+
+    while True:
+        job = upload_queue.get()
+        if job is None:
+            break
+
+        print(f"\n{'='*60}")
+        print(f"🎬 UPLOADING VIDEO {job.index + 1} OF {total_videos}")
+        print(f"🔗 URL: {job.url}")
+        print(f"{'='*60}")
+
+        if job.state == "done":
+            print("✅ Already uploaded (job manifest) - skipping. Delete its manifest to redo it.")
+            successful_processed += 1
+            continue
+
+        if job.state == "failed":
+            print(f"❌ Skipping video: {job.error}")
+            RETENTION.release(job.video_path, job.output_dir)
+            continue
+
+        if not countdown_done and UPLOAD_BACKEND == "pyautogui":
+            print("⚠  WARNING: Do not move mouse or keyboard during automation!")
+            print(f"🚀 Starting Tenor automation in {START_COUNTDOWN_SECONDS} seconds...")
+            for i in range(START_COUNTDOWN_SECONDS, 0, -1):
+                print(f"Starting in {i} seconds...")
+                pause(1, "start countdown")
+            countdown_done = True
+            import pyautogui
+            pyautogui.FAILSAFE = True
+
+        try:
+            process_tenor_upload(job)
+            print(f"\n🎉 Video {job.index + 1} uploaded! ({job.num_gifs} GIFs from {job.output_dir})")
+            successful_processed += 1
+        except KeyboardInterrupt:
+            print("\n🛑 Automation interrupted by user!")
+            raise
+        except Exception as e:
+            print(f"\n❌ Unexpected error during automation: {e}")
+        finally:
+            # Done with this video - if fully uploaded it may now be evicted
+            RETENTION.release(job.video_path, job.output_dir)
+
+    return successful_processed
+
+def run_pipeline(urls):
+    """
+    Process the whole URL list as a 3-stage pipeline: while video N is being
+    uploaded, video N+1 is converting and video N+2 is downloading.
+    Bounded queues keep at most PIPELINE_QUEUE_SIZE finished items between stages.
+    Returns the number of videos uploaded successfully.
+    """
+    convert_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    upload_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+    downloader = threading.Thread(target=download_stage, args=(urls, convert_queue), daemon=True)
+    converter = threading.Thread(target=convert_stage, args=(convert_queue, upload_queue), daemon=True)
+    downloader.start()
+    converter.start()
+
+    try:
+        return upload_stage(upload_queue, len(urls))
+    finally:
+        downloader.join(timeout=1)
+        converter.join(timeout=1)
+
+def run_urls(urls):
+    """
+    Download, convert and upload every URL - as a pipeline when there are
+    several and PIPELINE_ENABLED, else one by one - then print the summary,
+    apply the storage budget and print the performance report.
+    Returns the number of videos processed successfully.
+    """
+    urls = list(urls)
+    successful_processed = 0
+    
+    if PIPELINE_ENABLED and len(urls) > 1:
+        # Download, convert and upload different videos at the same time
+        print("🚀 Pipeline mode: downloading and converting ahead of the uploads")
+        try:
+            successful_processed = run_pipeline(urls)
+        except KeyboardInterrupt:
+            print("\n🛑 Pipeline interrupted by user!")
+    else:
+        # Process each video one by one
+        for i, url in enumerate(urls):
+            if process_single_video(url, len(urls), i):
+                successful_processed += 1
+                
+            # If there are more videos, wait before starting next one
+            if i < len(urls) - 1:
+                next_video_num = i + 2
+                print(f"\n⏳ Preparing for next video ({next_video_num}/{len(urls)}) in 5 seconds...")
+                pause(5, "between videos")
+    
+    # Final summary
+    print(f"\n{'='*60}")
+    print("📊 PROCESSING SUMMARY")
+    print(f"{'='*60}")
+    print(f"✅ Successfully processed: {successful_processed}/{len(urls)} videos")
+    print(f"❌ Failed: {len(urls) - successful_processed}/{len(urls)} videos")
+    RETENTION.enforce()
+    TIMER.report()
+    print("🎉 All operations completed!")
+    return successful_processed